@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from lecroyscope.control.simulator import synthetic_trc
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--trc-samples",
+        type=int,
+        default=1_000_000,
+        help="number of samples of the synthetic trace files used in benchmarks",
+    )
+
+
+def make_trc(
+    filename: str | Path,
+    samples: int,
+    segments: int = 1,
+    word: bool = True,
+    endianness: str = "<",
+    seed: int = 0,
+) -> int:
+    """
+    Write a synthetic trc file with `samples` points per segment. Returns the size of the file in bytes
+    """
+    Path(filename).write_bytes(
+        synthetic_trc(samples, segments, word, endianness, seed=seed)
+    )
+    return Path(filename).stat().st_size
+
+
+def set_throughput(
+    benchmark,
+    number_of_bytes: int = 0,
+    number_of_files: int = 0,
+    number_of_triggers: int = 0,
+):
+    """
+    Store the throughput (MB/s, files/s and triggers/s) computed from the mean time of the benchmark in the report
+    """
+    if benchmark.stats is None:
+        # benchmarks are disabled (--benchmark-disable)
+        return
+    mean = benchmark.stats.stats.mean
+    if number_of_bytes:
+        benchmark.extra_info["MB/s"] = number_of_bytes / mean / 1e6
+    if number_of_files:
+        benchmark.extra_info["files/s"] = number_of_files / mean
+    if number_of_triggers:
+        benchmark.extra_info["triggers/s"] = number_of_triggers / mean
+
+
+@pytest.fixture(scope="session")
+def trc_samples(request) -> int:
+    return request.config.getoption("--trc-samples")
+
+
+@pytest.fixture(scope="session")
+def trc_factory(tmp_path_factory):
+    """
+    Returns a function creating (and caching) synthetic trc files: trc_factory(samples, segments, word, endianness)
+    """
+    directory = tmp_path_factory.mktemp("trc")
+    cache = {}
+
+    def factory(
+        samples: int,
+        segments: int = 1,
+        word: bool = True,
+        endianness: str = "<",
+        channel: int = 1,
+        trace_number: int = 0,
+    ) -> tuple[Path, int]:
+        key = (samples, segments, word, endianness, channel, trace_number)
+        if key not in cache:
+            filename = (
+                directory
+                / f"{samples}_{segments}_{int(word)}_{endianness == '<'}"
+                / f"C{channel}Trace{trace_number:05d}.trc"
+            )
+            filename.parent.mkdir(exist_ok=True)
+            cache[key] = filename, make_trc(
+                filename, samples, segments, word, endianness
+            )
+        return cache[key]
+
+    return factory
@@ -0,0 +1,33 @@
+import pytest
+
+import lecroyscope
+
+from .conftest import set_throughput
+
+pytest.importorskip("pytest_benchmark")
+
+number_of_files = 200
+
+
+@pytest.fixture(scope="module")
+def run_files(trc_factory):
+    return [
+        trc_factory(1000, channel=1, trace_number=trace_number)[0]
+        for trace_number in range(number_of_files)
+    ]
+
+
+def test_trace_header_only(benchmark, run_files):
+    def read_headers():
+        return [
+            lecroyscope.Trace(filename, header_only=True).header.trigger_time
+            for filename in run_files
+        ]
+
+    benchmark(read_headers)
+    set_throughput(benchmark, number_of_files=number_of_files)
+
+
+def test_read_headers(benchmark, run_files):
+    benchmark(lecroyscope.reading.read_headers, *run_files)
+    set_throughput(benchmark, number_of_files=number_of_files)
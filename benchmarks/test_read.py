@@ -0,0 +1,61 @@
+import pytest
+
+import lecroyscope
+
+from .conftest import set_throughput
+
+pytest.importorskip("pytest_benchmark")
+
+formats = pytest.mark.parametrize(
+    "word, endianness",
+    [(True, "<"), (False, "<"), (True, ">")],
+    ids=["word-little", "byte-little", "word-big"],
+)
+segments = pytest.mark.parametrize("segments", [1, 100])
+
+
+@formats
+@segments
+def test_read(benchmark, trc_factory, trc_samples, word, endianness, segments):
+    filename, size = trc_factory(trc_samples // segments, segments, word, endianness)
+    benchmark(lecroyscope.reading.read, filename)
+    set_throughput(benchmark, number_of_bytes=size, number_of_files=1)
+
+
+@formats
+@segments
+def test_read_memory_map(
+    benchmark, trc_factory, trc_samples, word, endianness, segments
+):
+    filename, size = trc_factory(trc_samples // segments, segments, word, endianness)
+    benchmark(lecroyscope.reading.read, filename, memory_map=True)
+    set_throughput(benchmark, number_of_bytes=size, number_of_files=1)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+@segments
+def test_trace_voltage(benchmark, trc_factory, trc_samples, dtype, segments):
+    filename, size = trc_factory(trc_samples // segments, segments)
+
+    def construct():
+        trace = lecroyscope.Trace(filename, dtype=dtype)
+        return trace.time, trace.voltage
+
+    benchmark(construct)
+    set_throughput(benchmark, number_of_bytes=size, number_of_files=1)
+
+
+def test_read_segments(benchmark, trc_factory, trc_samples):
+    segments = 1000
+    filename, size = trc_factory(trc_samples // segments, segments)
+    benchmark(lecroyscope.reading.read, filename, segments=slice(100, 110))
+    set_throughput(benchmark, number_of_bytes=size // 100, number_of_files=1)
+
+
+@formats
+@segments
+def test_read_bytes(benchmark, trc_factory, trc_samples, word, endianness, segments):
+    filename, size = trc_factory(trc_samples // segments, segments, word, endianness)
+    data = b"C1:WF ALL," + filename.read_bytes()
+    benchmark(lecroyscope.reading.read, data)
+    set_throughput(benchmark, number_of_bytes=size, number_of_files=1)
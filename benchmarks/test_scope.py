@@ -0,0 +1,60 @@
+import pytest
+
+import lecroyscope
+from lecroyscope.control import Acquisition, SimulatedInstrument
+
+from .conftest import set_throughput
+
+pytest.importorskip("pytest_benchmark")
+
+channels = pytest.mark.parametrize(
+    "channels", [(1,), (1, 2, 3, 4)], ids=["1-channel", "4-channels"]
+)
+
+
+def _scope(samples: int, segments: int = 1, **kwargs) -> lecroyscope.Scope:
+    return lecroyscope.Scope(
+        instrument=SimulatedInstrument(samples=samples, segments=segments, **kwargs)
+    )
+
+
+@channels
+def test_scope_acquire_read(benchmark, trc_samples, channels):
+    scope = _scope(trc_samples)
+    size = sum(len(data) for data in scope.read_raw(*channels))
+
+    def acquire_read():
+        scope.acquire()
+        return scope.read(*channels)
+
+    benchmark(acquire_read)
+    set_throughput(benchmark, number_of_bytes=size, number_of_triggers=1)
+
+
+@channels
+def test_scope_acquire_read_raw(benchmark, trc_samples, channels):
+    scope = _scope(trc_samples)
+    size = sum(len(data) for data in scope.read_raw(*channels))
+
+    def acquire_read_raw():
+        scope.acquire()
+        return scope.read_raw(*channels)
+
+    benchmark(acquire_read_raw)
+    set_throughput(benchmark, number_of_bytes=size, number_of_triggers=1)
+
+
+@pytest.mark.parametrize("latency", [0.0, 1e-3])
+def test_acquisition_loop(benchmark, trc_samples, latency):
+    events = 20
+    channels = (1, 2)
+    scope = _scope(trc_samples // 10, latency=latency)
+    size = sum(len(data) for data in scope.read_raw(*channels))
+
+    def run():
+        with Acquisition(scope, *channels, max_events=events) as acquisition:
+            for event in acquisition:
+                lecroyscope.TraceGroup(*event.data)
+
+    benchmark(run)
+    set_throughput(benchmark, number_of_bytes=size * events, number_of_triggers=events)
@@ -0,0 +1,50 @@
+import pytest
+
+import lecroyscope
+
+from .conftest import set_throughput
+
+pytest.importorskip("pytest_benchmark")
+
+channels = [1, 2, 3, 4]
+
+
+@pytest.fixture(scope="module")
+def channel_files(trc_factory, trc_samples):
+    return [trc_factory(trc_samples, channel=channel) for channel in channels]
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_trace_group(benchmark, channel_files, workers):
+    def load():
+        trace_group = lecroyscope.TraceGroup(
+            *[filename for filename, _ in channel_files], workers=workers
+        )
+        return [trace.voltage for trace in trace_group]
+
+    benchmark(load)
+    set_throughput(
+        benchmark,
+        number_of_bytes=sum(size for _, size in channel_files),
+        number_of_files=len(channel_files),
+    )
+
+
+def test_run(benchmark, trc_factory):
+    number_of_events = 50
+    filenames = [
+        trc_factory(10_000, channel=channel, trace_number=trace_number)
+        for channel in channels
+        for trace_number in range(number_of_events)
+    ]
+    run = lecroyscope.Run(filenames[0][0].parent)
+
+    def iterate():
+        return [trace_group.time for trace_group in run]
+
+    benchmark(iterate)
+    set_throughput(
+        benchmark,
+        number_of_bytes=sum(size for _, size in filenames),
+        number_of_files=len(filenames),
+    )
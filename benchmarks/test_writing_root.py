@@ -0,0 +1,54 @@
+import pytest
+
+import lecroyscope
+
+from .conftest import set_throughput
+
+pytest.importorskip("pytest_benchmark")
+uproot = pytest.importorskip("uproot")
+
+
+@pytest.mark.parametrize("segments", [1, 100])
+def test_writing_tree(benchmark, trc_factory, trc_samples, tmp_path, segments):
+    filenames = [
+        trc_factory(trc_samples // segments, segments, channel=channel)
+        for channel in [1, 2]
+    ]
+    trace_group = lecroyscope.TraceGroup(*[filename for filename, _ in filenames])
+
+    def write():
+        with uproot.recreate(tmp_path / "benchmark.root") as f:
+            tree = f.mktree(
+                "t",
+                lecroyscope.writing.root.get_tree_branch_definitions(trace_group),
+            )
+            tree.extend(lecroyscope.writing.root.get_tree_extend_data(trace_group))
+
+    benchmark(write)
+    set_throughput(
+        benchmark,
+        number_of_bytes=sum(size for _, size in filenames),
+        number_of_files=len(filenames),
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [100, 10_000])
+def test_write_tree(benchmark, trc_factory, tmp_path, chunk_size):
+    filenames = [
+        trc_factory(1000, 100, channel=channel, trace_number=trace_number)
+        for channel in [1, 2]
+        for trace_number in range(20)
+    ]
+    run = lecroyscope.Run(filenames[0][0].parent)
+
+    benchmark(
+        lecroyscope.writing.root.write_tree,
+        tmp_path / "benchmark.root",
+        run,
+        chunk_size=chunk_size,
+    )
+    set_throughput(
+        benchmark,
+        number_of_bytes=sum(size for _, size in filenames),
+        number_of_files=len(filenames),
+    )
@@ -1,6 +1,8 @@
-from .reading import Trace, TraceGroup
+from .reading import Trace, TraceGroup, Run
 from .control import Scope
 
+from . import writing
+
 try:
     from .writing import root
 except ImportError:
@@ -1 +1,5 @@
 from .scope import Scope
+from .acquisition import Acquisition, AcquiredEvent
+from .async_scope import AsyncScope
+from .simulator import SimulatedInstrument
+from .multi_scope import MultiScope, MultiScopeEvent
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Iterator
+
+from .scope import Scope
+
+# interval (in seconds) to check if the acquisition was stopped while waiting on the queue
+_poll_interval = 0.01
+
+
+class AcquiredEvent:
+    def __init__(self, number: int, timestamp: float, data: list[bytes]):
+        """
+        Raw waveform data of the channels read after a trigger. `timestamp` is the time (as in `time.time`) at which
+        the acquisition completed. The data can be parsed with `lecroyscope.Trace` / `lecroyscope.TraceGroup`
+        """
+        self.number = number
+        self.timestamp = timestamp
+        self.data = data
+
+    def __len__(self) -> int:
+        return sum(len(data) for data in self.data)
+
+
+class Acquisition:
+    def __init__(
+        self,
+        scope: Scope,
+        *channels: int,
+        queue_size: int = 16,
+        block: bool = True,
+        force: bool = False,
+        max_events: int | None = None,
+    ):
+        """
+        Continuous acquisition loop: a dedicated thread arms the scope, waits for a trigger and reads the raw data of
+        `channels`, pushing an `AcquiredEvent` into a bounded queue of `queue_size` events. Consumer threads iterate
+        over the acquisition to parse and persist the data.
+
+        If the queue is full and `block` is True the loop waits for the consumers (back-pressure, the scope is not
+        re-armed meanwhile), an event still waiting when `stop` is called is dropped. If `block` is False the event is
+        dropped as soon as the queue is full. Dropped events are counted in `dropped`.
+        Acquisitions that time out without a trigger are counted in `timeouts`.
+        The loop stops after `max_events` events (if given) or when `stop` is called.
+        """
+        if len(channels) == 0:
+            raise ValueError("At least one channel must be specified")
+        if queue_size <= 0:
+            raise ValueError("Queue size must be a positive integer")
+        self._scope = scope
+        self._channels = channels
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._block = block
+        self._force = force
+        self._max_events = max_events
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._exception = None
+        self._lock = threading.Lock()
+
+        self._triggers = 0
+        self._dropped = 0
+        self._timeouts = 0
+        self._bytes = 0
+        self._start_time = None
+        self._stop_time = None
+
+    def __enter__(self) -> Acquisition:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self.running:
+            raise RuntimeError("Acquisition is already running")
+        self._stop_event.clear()
+        self._exception = None
+        self._start_time = time.perf_counter()
+        self._stop_time = None
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops the acquisition loop after the current acquisition and waits for the thread to finish.
+        Events already in the queue can still be consumed
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._raise_exception()
+
+    def join(self, timeout: float | None = None) -> None:
+        """
+        Waits for the acquisition loop to finish (e.g. after `max_events` events) without stopping it
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._raise_exception()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _raise_exception(self) -> None:
+        if self._exception is not None:
+            exception, self._exception = self._exception, None
+            raise exception
+
+    def _loop(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                if self._max_events is not None and self._triggers >= self._max_events:
+                    break
+                if not self._scope.acquire(force=self._force):
+                    with self._lock:
+                        self._timeouts += 1
+                    continue
+                timestamp = time.time()
+                event = AcquiredEvent(
+                    self._triggers, timestamp, self._scope.read_raw(*self._channels)
+                )
+                with self._lock:
+                    self._triggers += 1
+                    self._bytes += len(event)
+                if not self._put(event):
+                    with self._lock:
+                        self._dropped += 1
+        except Exception as exception:
+            self._exception = exception
+        finally:
+            self._stop_time = time.perf_counter()
+
+    def _put(self, event: AcquiredEvent) -> bool:
+        """
+        Puts the event into the queue, returns False if it was dropped
+        """
+        if not self._block:
+            try:
+                self._queue.put_nowait(event)
+                return True
+            except queue.Full:
+                return False
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(event, timeout=_poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, timeout: float | None = None) -> AcquiredEvent:
+        """
+        Returns the next event, waiting up to `timeout` seconds (raises `queue.Empty` if no event is available)
+        """
+        return self._queue.get(timeout=timeout)
+
+    def __iter__(self) -> Iterator[AcquiredEvent]:
+        """
+        Yields events until the acquisition is stopped and the queue is empty. Can be used from several threads
+        """
+        while True:
+            try:
+                yield self._queue.get(timeout=_poll_interval)
+            except queue.Empty:
+                if not self.running:
+                    self._raise_exception()
+                    if self._queue.empty():
+                        return
+
+    @property
+    def queue(self) -> queue.Queue:
+        return self._queue
+
+    @property
+    def triggers(self) -> int:
+        """
+        Number of acquired events (including dropped events)
+        """
+        return self._triggers
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of events dropped because the queue was full (if `block` is False) or the acquisition was stopped
+        while waiting for the consumers (if `block` is True)
+        """
+        return self._dropped
+
+    @property
+    def timeouts(self) -> int:
+        """
+        Number of acquisitions that timed out without a trigger
+        """
+        return self._timeouts
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Time in seconds since the acquisition was started (until it stopped)
+        """
+        if self._start_time is None:
+            return 0.0
+        end = self._stop_time if self._stop_time is not None else time.perf_counter()
+        return end - self._start_time
+
+    @property
+    def trigger_rate(self) -> float:
+        """
+        Achieved trigger rate (events per second)
+        """
+        elapsed = self.elapsed
+        return self._triggers / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def data_rate(self) -> float:
+        """
+        Achieved data transfer rate (bytes per second)
+        """
+        elapsed = self.elapsed
+        return self._bytes / elapsed if elapsed > 0 else 0.0
+
+    def statistics(self) -> dict[str, float]:
+        return {
+            "triggers": self.triggers,
+            "dropped": self.dropped,
+            "timeouts": self.timeouts,
+            "elapsed": self.elapsed,
+            "trigger_rate": self.trigger_rate,
+            "data_rate": self.data_rate,
+        }
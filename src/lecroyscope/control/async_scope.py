@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from lecroyscope import Trace, TraceGroup
+from .scope import Scope
+
+
+class AsyncScope:
+    def __init__(self, scope: Scope | str):
+        """
+        asyncio interface for a `Scope` (or the ip address of one). The blocking instrument calls run in a dedicated
+        thread per scope, so several scopes can be driven concurrently from the same event loop (e.g. with
+        `asyncio.gather`) while the calls to a single scope are kept in order.
+        """
+        self._scope = scope if isinstance(scope, Scope) else Scope(scope)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def __aenter__(self) -> AsyncScope:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Waits for the pending calls to finish without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @property
+    def scope(self) -> Scope:
+        return self._scope
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(function, *args, **kwargs)
+        )
+
+    async def get(self, parameter: str):
+        return await self._run(self._scope.get, parameter)
+
+    async def set(self, parameter: str, value: str | int | float):
+        return await self._run(self._scope.set, parameter, value)
+
+    async def acquire(self, force: bool = False) -> bool:
+        return await self._run(self._scope.acquire, force=force)
+
+    async def read_raw(self, *channels: int) -> list[bytes]:
+        return await self._run(self._scope.read_raw, *channels)
+
+    async def read(self, *channels: int, **kwargs) -> Trace | TraceGroup:
+        """
+        See `Scope.read`
+        """
+        return await self._run(self._scope.read, *channels, **kwargs)
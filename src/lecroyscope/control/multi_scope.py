@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import numpy
+
+from lecroyscope import Trace, TraceGroup
+from .scope import Scope
+
+
+def _reference_trace(trace_or_group: Trace | TraceGroup) -> Trace:
+    if isinstance(trace_or_group, TraceGroup):
+        return next(trace_or_group)
+    return trace_or_group
+
+
+def _trigger_times(trace: Trace) -> numpy.ndarray:
+    """
+    Returns the absolute trigger time of each segment of the trace (datetime64[ns]), computed from the 'trigger_time'
+    header field and the trigger times array
+    """
+    start = numpy.datetime64(trace.header["trigger_time"], "ns")
+    if not trace.sequence or trace.header_only:
+        return numpy.array([start])
+    offsets = numpy.round(trace.trigger_times[0] * 1e9).astype("timedelta64[ns]")
+    return start + offsets
+
+
+class MultiScopeEvent:
+    def __init__(
+        self,
+        data: dict[str, Trace | TraceGroup],
+        latency: dict[str, dict[str, float]],
+    ):
+        """
+        Data of all the scopes for a single trigger, as a dict {scope name: trace (group)}.
+        `latency` contains the time in seconds each scope took to trigger ("acquire"), to transfer the data ("read")
+        and in total ("total")
+        """
+        self._data = data
+        self.latency = latency
+
+    def __getitem__(self, name: str) -> Trace | TraceGroup:
+        return self._data[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def trigger_times(self) -> dict[str, numpy.ndarray]:
+        """
+        Returns the absolute trigger time of each segment (datetime64[ns]) of each scope
+        """
+        return {
+            name: _trigger_times(_reference_trace(data))
+            for name, data in self._data.items()
+        }
+
+    @property
+    def trigger_time(self) -> numpy.datetime64:
+        """
+        Trigger time of the event (first segment of the first scope), used as the key of the event
+        """
+        return _trigger_times(_reference_trace(next(iter(self._data.values()))))[0]
+
+    @property
+    def time_offsets(self) -> dict[str, float]:
+        """
+        Difference in seconds between the trigger time of each scope and the trigger time of the event
+        (e.g. to check the synchronization of the scope clocks)
+        """
+        reference = self.trigger_time
+        return {
+            name: (times[0] - reference) / numpy.timedelta64(1, "s")
+            for name, times in self.trigger_times.items()
+        }
+
+
+class MultiScope:
+    def __init__(
+        self,
+        scopes: dict[str, Scope],
+        channels: dict[str, list[int]] | list[int],
+        force: bool = False,
+        tolerance: float | None = None,
+        **read_kwargs,
+    ):
+        """
+        Coordinates several scopes sharing a trigger. Each acquisition arms all scopes concurrently (one thread per
+        scope) and every scope reads its `channels` as soon as it triggers, in parallel with the others.
+        `channels` is either a dict {scope name: channels} or a list of channels read from all scopes.
+        If `tolerance` is given, events whose trigger times differ between scopes by more than `tolerance` seconds
+        (see `MultiScopeEvent.time_offsets`) are rejected, e.g. when a scope missed a trigger.
+        Additional keyword arguments are forwarded to `Scope.read`
+        """
+        if len(scopes) == 0:
+            raise ValueError("At least one scope must be specified")
+        if not isinstance(channels, dict):
+            channels = {name: list(channels) for name in scopes}
+        if set(channels) != set(scopes):
+            raise ValueError("Channels must be specified for every scope")
+        if tolerance is not None and tolerance < 0:
+            raise ValueError(f"Invalid tolerance: {tolerance}. Must be non-negative")
+        self._scopes = dict(scopes)
+        self._channels = channels
+        self._force = force
+        self._tolerance = tolerance
+        self._read_kwargs = read_kwargs
+        self._executor = ThreadPoolExecutor(max_workers=len(scopes))
+        self.timeouts = {name: 0 for name in scopes}
+        # events rejected because the trigger times of the scopes differ by more than the tolerance
+        self.mismatches = 0
+
+    def __enter__(self) -> MultiScope:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @property
+    def scopes(self) -> dict[str, Scope]:
+        return dict(self._scopes)
+
+    def _acquire_read(self, name: str) -> tuple[Trace | TraceGroup | None, dict]:
+        scope = self._scopes[name]
+        start = time.perf_counter()
+        triggered = scope.acquire(force=self._force)
+        acquired = time.perf_counter()
+        data = None
+        if triggered:
+            data = scope.read(*self._channels[name], **self._read_kwargs)
+        end = time.perf_counter()
+        return data, {
+            "acquire": acquired - start,
+            "read": end - acquired,
+            "total": end - start,
+        }
+
+    def acquire(self) -> MultiScopeEvent | None:
+        """
+        Acquires and reads a single event from all scopes. Returns None if any of the scopes did not trigger before
+        its timeout (counted in `timeouts`) or if the trigger times of the scopes do not match within the tolerance
+        (counted in `mismatches`)
+        """
+        futures = {
+            name: self._executor.submit(self._acquire_read, name)
+            for name in self._scopes
+        }
+        data = dict()
+        latency = dict()
+        for name, future in futures.items():
+            data[name], latency[name] = future.result()
+        missed = [name for name, value in data.items() if value is None]
+        for name in missed:
+            self.timeouts[name] += 1
+        if len(missed) > 0:
+            return None
+        event = MultiScopeEvent(data, latency)
+        if self._tolerance is not None and any(
+            abs(offset) > self._tolerance for offset in event.time_offsets.values()
+        ):
+            self.mismatches += 1
+            return None
+        return event
+
+    def record(
+        self, number_of_events: int, max_misses: int | None = 10
+    ) -> dict[numpy.datetime64, MultiScopeEvent]:
+        """
+        Acquires `number_of_events` complete events and returns them keyed by trigger time.
+        Raises a RuntimeError after `max_misses` consecutive acquisitions without a complete event (no limit if None)
+        """
+        events = dict()
+        misses = 0
+        while len(events) < number_of_events:
+            event = self.acquire()
+            if event is None:
+                misses += 1
+                if max_misses is not None and misses >= max_misses:
+                    raise RuntimeError(
+                        f"No complete event in {misses} consecutive acquisitions "
+                        f"(timeouts: {self.timeouts}, mismatches: {self.mismatches})"
+                    )
+                continue
+            misses = 0
+            if event.trigger_time in events:
+                raise ValueError(f"Duplicate trigger time: {event.trigger_time}")
+            events[event.trigger_time] = event
+        return events
@@ -1,8 +1,10 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 
 import vxi11
 import ipaddress
+import re
 
 from lecroyscope import Trace, TraceGroup
 
@@ -28,6 +30,85 @@ def _get_command(parameter: str) -> str:
     return f"VBS? 'return = app.{parameter}'"
 
 
+# the values read in a batch are joined with a control character which cannot appear in the value of a parameter
+_batch_separator = "\x01"
+
+
+def _batch_command(
+    assignments: list[tuple[str, str | int | float]], queries: list[str]
+) -> str:
+    lines = [f'app.{parameter} = "{value}"' for parameter, value in assignments]
+    if len(queries) > 0:
+        values = f" & Chr({ord(_batch_separator)}) & ".join(
+            f"CStr(app.{parameter})" for parameter in queries
+        )
+        lines.append(f"return = {values}")
+    script = "\n".join(lines)
+    return f"VBS? '{script}'"
+
+
+_block_regex = re.compile(rb"#9(\d{9})")
+
+
+def _block_size(data: bytes) -> int | None:
+    """
+    Returns the total size of a waveform response (e.g. 'C1:WF ALL,#9000001234...') from its first bytes, including
+    the terminator. None if the size cannot be determined
+    """
+    match = _block_regex.search(data[:64])
+    if match is None:
+        return None
+    return match.end() + int(match.group(1)) + 1
+
+
+try:
+    from vxi11.vxi11 import RX_CHR, RX_END, OP_FLAG_TERMCHAR_SET, Vxi11Exception
+except ImportError:
+    RX_CHR = RX_END = OP_FLAG_TERMCHAR_SET = Vxi11Exception = None
+
+# (private) attributes of 'vxi11.Instrument' (python-vxi11 0.9) used to receive a response in chunks
+_vxi11_read_attributes = [
+    "link",
+    "client",
+    "term_char",
+    "max_recv_size",
+    "_timeout_ms",
+    "_lock_timeout_ms",
+]
+
+
+def _chunked_read(instrument) -> bool:
+    """
+    Returns True if the response of the instrument can be received in chunks (see `Scope._read_chunks`), otherwise
+    it is read with `read_raw`
+    """
+    return (
+        isinstance(instrument, vxi11.Instrument)
+        and Vxi11Exception is not None
+        and all(hasattr(instrument, name) for name in _vxi11_read_attributes)
+    )
+
+
+# settings cached by 'Scope' when the cache is enabled (those used by the properties of 'Scope' and 'Channel'), other
+# parameters (e.g. measurements or the acquisition status) may change at any time and are always queried
+_cached_parameter_regex = re.compile(
+    r"^Acquisition\.(Horizontal\.(SampleMode|NumSegments)|TriggerMode|C\d+\.(VerScale|VerOffset|Coupling))$"
+)
+
+
+def _cached_parameter(parameter: str) -> bool:
+    return _cached_parameter_regex.match(parameter) is not None
+
+
+def _same_value(value: str, other: str | int | float) -> bool:
+    if value == str(other):
+        return True
+    try:
+        return float(value) == float(other)
+    except ValueError:
+        return False
+
+
 def _capitalize_first_letter(string: str) -> str:
     if len(string) == 0:
         return string
@@ -35,15 +116,36 @@ def _capitalize_first_letter(string: str) -> str:
 
 
 class Scope:
-    def __init__(self, ip_address: str):
-        # validate ip address
-        ip_address = str(ipaddress.ip_address(ip_address))
-
-        self._instrument = vxi11.Instrument(ip_address)
+    def __init__(
+        self, ip_address: str | None = None, instrument=None, cache: bool = False
+    ):
+        """
+        Connects to the scope at `ip_address`. Alternatively an already connected `instrument` with the interface of
+        `vxi11.Instrument` (e.g. `lecroyscope.control.SimulatedInstrument`) can be given.
+        If `cache` is True the last known value of each setting is cached (see `cache`)
+        """
+        if instrument is None:
+            if ip_address is None:
+                raise ValueError("Either 'ip_address' or 'instrument' must be given")
+            # validate ip address
+            ip_address = str(ipaddress.ip_address(ip_address))
+            instrument = vxi11.Instrument(ip_address)
+
+        self._instrument = instrument
         self.timeout = 30.0
+        # used to parse traces while the next channel is transferred
+        self._executor = None
+        # receive buffers of each channel, reused when reading with 'reuse_buffers'
+        self._buffers = dict()
+        # last waveform setup sent to the scope ('WFSU')
+        self._waveform_setup = None
+        self._cache = dict() if cache else None
 
     def __del__(self):
-        self._instrument.close()
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=False)
+        if getattr(self, "_instrument", None) is not None:
+            self._instrument.close()
 
     @property
     def timeout(self) -> float:
@@ -61,30 +163,290 @@ class Scope:
     def _ask(self, command: str):
         return _parse_response(self.instrument.ask(command))
 
+    @property
+    def cache(self) -> bool:
+        """
+        Whether settings are cached. When enabled `get` returns the last known value of a setting without querying
+        the scope and `set` is skipped if the value does not change. Only the settings used by the properties of
+        `Scope` and `Channel` (sample mode, number of segments, trigger mode and vertical settings of the channels) are
+        cached, other parameters are always queried. Settings changed from the front panel are not detected,
+        use `invalidate` or `refresh` in that case
+        """
+        return self._cache is not None
+
+    @cache.setter
+    def cache(self, value: bool) -> None:
+        if not value:
+            self._cache = None
+        elif self._cache is None:
+            self._cache = dict()
+
+    def invalidate(self, *parameters: str) -> None:
+        """
+        Removes the given parameters (all if none are given) from the settings cache
+        """
+        if self._cache is None:
+            return
+        if len(parameters) == 0:
+            self._cache.clear()
+        for parameter in parameters:
+            self._cache.pop(parameter, None)
+
+    def refresh(self) -> dict[str, str]:
+        """
+        Reads again all the cached parameters (in a single round trip) and returns their values
+        """
+        if self._cache is None or len(self._cache) == 0:
+            return dict()
+        batch = self.batch()
+        for parameter in self._cache:
+            batch.get(parameter)
+        return batch.execute()
+
+    def _cached(self, parameter: str) -> bool:
+        return self._cache is not None and _cached_parameter(parameter)
+
     def get(self, parameter: str):
-        return self._ask(_get_command(parameter))
+        if self._cached(parameter) and parameter in self._cache:
+            return self._cache[parameter]
+        value = self._ask(_get_command(parameter))
+        if self._cached(parameter):
+            self._cache[parameter] = value
+        return value
 
     def set(self, parameter: str, value: str | int | float):
-        return self._ask(_set_command(parameter, value, return_value=True))
+        if self._cached(parameter):
+            cached = self._cache.get(parameter)
+            if cached is not None and _same_value(cached, value):
+                return cached
+        value = self._ask(_set_command(parameter, value, return_value=True))
+        if self._cached(parameter):
+            self._cache[parameter] = value
+        return value
+
+    def _settings_parameters(self) -> list[str]:
+        parameters = [
+            "Acquisition.Horizontal.SampleMode",
+            "Acquisition.Horizontal.NumSegments",
+            "Acquisition.TriggerMode",
+        ]
+        for name in self.name_all:
+            if name.startswith("C") and len(name) == 2:
+                parameters += [
+                    f"Acquisition.{name}.VerScale",
+                    f"Acquisition.{name}.VerOffset",
+                    f"Acquisition.{name}.Coupling",
+                ]
+        return parameters
+
+    def snapshot(self, parameters: list[str] | None = None) -> dict[str, str]:
+        """
+        Reads the configuration of the scope in a single round trip and returns it as a dict {parameter: value}.
+        By default, the sample mode, number of segments, trigger mode and the vertical settings of all the channels
+        are read
+        """
+        if parameters is None:
+            parameters = self._settings_parameters()
+        batch = self.batch()
+        for parameter in parameters:
+            batch.get(parameter)
+        return batch.execute()
+
+    def restore(self, snapshot: dict[str, str | int | float]) -> None:
+        """
+        Sets all the parameters of a snapshot (see `snapshot`) in a single round trip. If the cache is enabled
+        parameters whose cached value is unchanged are not sent
+        """
+        batch = self.batch()
+        for parameter, value in snapshot.items():
+            if self._cache is not None:
+                cached = self._cache.get(parameter)
+                if cached is not None and _same_value(cached, value):
+                    continue
+            batch.set(parameter, value)
+        batch.execute()
+
+    def batch(self) -> Batch:
+        """
+        Returns a batch to send several assignments and reads in a single VBS command (one round trip)
+        """
+        return Batch(self)
 
     def acquire(self, force: bool = False) -> bool:
         response = self._ask(
             f"VBS? 'return = app.Acquisition.acquire({self.timeout}, {force})'"
         )
+        # the trigger mode may change after an acquisition
+        self.invalidate("Acquisition.TriggerMode")
         if response not in ["0", "1"]:
             raise ValueError(f"Unexpected response from scope: {response}")
         return bool(int(response))
 
-    def read(self, *channels: int) -> Trace | TraceGroup:
+    @property
+    def transfer_format(self) -> str:
+        """
+        Returns the width of the transferred values: "BYTE" (8 bit) or "WORD" (16 bit)
+        """
+        # e.g. 'CFMT DEF9,WORD,BIN'
+        return self._ask("CFMT?").split(",")[1]
+
+    @transfer_format.setter
+    def transfer_format(self, value: str):
+        """
+        Sets the width of the transferred values. "BYTE" halves the transfer size at the cost of resolution
+        """
+        transfer_formats = ["BYTE", "WORD"]
+        if value.upper() not in transfer_formats:
+            raise ValueError(
+                f"Invalid transfer format: {value}. Valid transfer formats are: {transfer_formats}"
+            )
+        self.instrument.write(f"CFMT DEF9,{value.upper()},BIN")
+
+    def waveform_setup(
+        self,
+        sparsing: int = 0,
+        number_of_points: int = 0,
+        first_point: int = 0,
+        segment: int = 0,
+    ) -> None:
+        """
+        Selects the part of the waveforms transferred by `read` ('WFSU'): every `sparsing` point (0 for all points),
+        up to `number_of_points` points (0 for all), starting at `first_point`, and a single `segment` of sequence
+        acquisitions (starting at 1, 0 for all segments). The setup applies to all channels until changed.
+        The header of the transferred traces describes the selection, so the `time` of the traces is correct
+        """
+        setup = (sparsing, number_of_points, first_point, segment)
+        for name, value in zip(
+            ["sparsing", "number_of_points", "first_point", "segment"], setup
+        ):
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{name} must be a non-negative integer")
+        if setup == self._waveform_setup:
+            return
+        self.instrument.write(
+            f"WFSU SP,{sparsing},NP,{number_of_points},FP,{first_point},SN,{segment}"
+        )
+        self._waveform_setup = setup
+
+    def _read_chunks(self):
+        """
+        Yields the chunks of the response of a `vxi11.Instrument` as they are received (see `_chunked_read`)
+        """
+        instrument = self.instrument
+        # same as 'vxi11.Instrument.read_raw' without joining the chunks
+        if instrument.link is None:
+            instrument.open()
+        flags = 0
+        term_char = 0
+        if instrument.term_char is not None:
+            flags = OP_FLAG_TERMCHAR_SET
+            term_char = str(instrument.term_char).encode("utf-8")[0]
+        reason = 0
+        while reason & (RX_END | RX_CHR) == 0:
+            error, reason, data = instrument.client.device_read(
+                instrument.link,
+                instrument.max_recv_size,
+                instrument._timeout_ms,
+                instrument._lock_timeout_ms,
+                flags,
+                term_char,
+            )
+            if error:
+                raise Vxi11Exception(error, "read")
+            yield data
+
+    def _receive(self, buffer: bytearray | None = None) -> tuple[bytearray, int]:
+        """
+        Receives the response of the instrument into `buffer` (a new buffer is allocated if it is too small).
+        Returns the buffer and the number of bytes received
+        """
+        size = 0
+        for chunk in self._read_chunks():
+            if size == 0:
+                expected = _block_size(chunk) or len(chunk)
+                if buffer is None or len(buffer) < expected:
+                    buffer = bytearray(expected)
+            end = size + len(chunk)
+            if end > len(buffer):
+                # the buffer may be exported (traces of a previous read) so it is not resized
+                buffer = buffer[:size] + bytearray(end - size)
+            buffer[size:end] = chunk
+            size = end
+        if buffer is None:
+            buffer = bytearray()
+        return buffer, size
+
+    def _read_waveform(
+        self, channel: int, reuse_buffer: bool = False
+    ) -> bytes | bytearray | memoryview:
+        self.instrument.write(f"C{channel}:WF?")
+        if not _chunked_read(self.instrument):
+            # the response is already a single buffer, no need to copy it
+            return self.instrument.read_raw()
+        if not reuse_buffer:
+            buffer, size = self._receive()
+            del buffer[size:]
+            return buffer
+        buffer, size = self._receive(self._buffers.get(channel))
+        self._buffers[channel] = buffer
+        return memoryview(buffer)[:size]
+
+    def read_raw(self, *channels: int) -> list[bytes | bytearray]:
+        """
+        Returns the raw waveform data (as returned by 'C{n}:WF?') of each channel without parsing it.
+        The data can later be parsed with `Trace`
+        """
+        if len(channels) == 0:
+            raise ValueError("At least one channel must be specified")
+        return [self._read_waveform(channel) for channel in channels]
+
+    def read(
+        self,
+        *channels: int,
+        header_only: bool = False,
+        reuse_buffers: bool = False,
+        **waveform_setup,
+    ) -> Trace | TraceGroup:
+        """
+        Reads the traces of the given channels. When reading multiple channels, each trace is parsed in a worker
+        thread while the data of the next channel is being transferred.
+        If `header_only` is True only the header of each trace is parsed.
+        If any of the `waveform_setup` arguments (`sparsing`, `number_of_points`, `first_point`, `segment`) is given,
+        the transfer is set up before reading (see `waveform_setup`), otherwise the current setup is used.
+
+        The data of each channel is received into a buffer and the traces are views into it (no copies).
+        If `reuse_buffers` is True the same buffer is used for each channel in every read, avoiding allocations, but
+        the values of the returned traces are overwritten by the next read (copy them if they need to be kept).
+        Buffers are only used with a `vxi11.Instrument`, the traces of other instruments are views into the data
+        returned by their `read_raw`.
+        """
         if len(channels) == 0:
             raise ValueError("At least one channel must be specified")
-        traces = []
-        for channel in channels:
-            self.instrument.write(f"C{channel}:WF?")
-            trace = Trace(self.instrument.read_raw())
+        if len(waveform_setup) > 0:
+            self.waveform_setup(**waveform_setup)
+        if len(channels) == 1:
+            traces = [
+                Trace(
+                    self._read_waveform(channels[0], reuse_buffers),
+                    header_only=header_only,
+                )
+            ]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            futures = [
+                self._executor.submit(
+                    Trace,
+                    self._read_waveform(channel, reuse_buffers),
+                    header_only=header_only,
+                )
+                for channel in channels
+            ]
+            traces = [future.result() for future in futures]
+
+        for channel, trace in zip(channels, traces):
             if trace.channel != channel:
                 raise ValueError(f"Unexpected channel: {trace.channel}")
-            traces.append(trace)
         return traces[0] if len(traces) == 1 else TraceGroup(*traces)
 
     @property
@@ -97,28 +459,28 @@ class Scope:
 
     @cached_property
     def name_all(self):
-        name_all = self._ask(_get_command("ExecsNameAll"))
+        name_all = self.get("ExecsNameAll")
         return name_all.split(",")
 
     @property
     def sample_mode(self):
-        return self._ask(_get_command("Acquisition.Horizontal.SampleMode"))
+        return self.get("Acquisition.Horizontal.SampleMode")
 
     @sample_mode.setter
     def sample_mode(self, value: str):
-        self._ask(_set_command("Acquisition.Horizontal.SampleMode", value))
+        self.set("Acquisition.Horizontal.SampleMode", value)
 
     @property
     def num_segments(self):
-        return int(self._ask(_get_command("Acquisition.Horizontal.NumSegments")))
+        return int(self.get("Acquisition.Horizontal.NumSegments"))
 
     @num_segments.setter
     def num_segments(self, value: int):
-        self._ask(_set_command("Acquisition.Horizontal.NumSegments", value))
+        self.set("Acquisition.Horizontal.NumSegments", value)
 
     @property
     def trigger_mode(self):
-        return self._ask(_get_command("Acquisition.TriggerMode"))
+        return self.get("Acquisition.TriggerMode")
 
     @trigger_mode.setter
     def trigger_mode(self, value: str):
@@ -127,12 +489,69 @@ class Scope:
             raise ValueError(
                 f"Invalid trigger mode: {value}. Valid trigger modes are: {trigger_modes}"
             )
-        self._ask(_set_command("Acquisition.TriggerMode", value))
+        self.set("Acquisition.TriggerMode", value)
 
     def channel(self, channel: int) -> Channel:
         return Channel(scope=self, channel=channel)
 
 
+class Batch:
+    def __init__(self, scope: Scope):
+        """
+        Collects assignments and reads of 'app.*' parameters and executes them in a single VBS script.
+        Assignments are executed first (in order), then all parameters are read.
+        Can be used as a context manager, the batch is executed on exit and the values are available in `values`.
+        """
+        self._scope = scope
+        self._assignments = []
+        self._queries = []
+        self.values = None
+
+    def __enter__(self) -> Batch:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def __len__(self) -> int:
+        return len(self._assignments) + len(self._queries)
+
+    def set(self, parameter: str, value: str | int | float) -> Batch:
+        self._assignments.append((parameter, value))
+        return self
+
+    def get(self, parameter: str) -> Batch:
+        self._queries.append(parameter)
+        return self
+
+    def execute(self) -> dict[str, str]:
+        """
+        Sends the batch to the scope and returns the values of the read parameters as a dict {parameter: value}
+        """
+        if len(self) == 0:
+            self.values = dict()
+            return self.values
+        response = self._scope._ask(_batch_command(self._assignments, self._queries))
+        self.values = dict()
+        if len(self._queries) > 0:
+            values = response.split(_batch_separator)
+            if len(values) != len(self._queries):
+                raise ValueError(f"Unexpected response from scope: {response}")
+            self.values = dict(zip(self._queries, values))
+        if self._scope._cache is not None:
+            # values of assigned parameters are only known if they were also read
+            self._scope.invalidate(*(parameter for parameter, _ in self._assignments))
+            self._scope._cache.update(
+                (parameter, value)
+                for parameter, value in self.values.items()
+                if _cached_parameter(parameter)
+            )
+        self._assignments.clear()
+        self._queries.clear()
+        return self.values
+
+
 class Channel:
     def __init__(self, scope: Scope, channel: int):
         self._scope = scope
@@ -158,31 +577,41 @@ class Channel:
 
     @property
     def vertical_scale(self) -> float:
-        return float(
-            self._scope._ask(_get_command(f"Acquisition.{str(self)}.VerScale"))
-        )
+        return float(self._scope.get(f"Acquisition.{str(self)}.VerScale"))
 
     @vertical_scale.setter
     def vertical_scale(self, value: float) -> None:
-        self._scope._ask(_set_command(f"Acquisition.{str(self)}.VerScale", value))
+        self._scope.set(f"Acquisition.{str(self)}.VerScale", value)
 
     @property
     def vertical_offset(self) -> float:
-        return float(
-            self._scope._ask(_get_command(f"Acquisition.{str(self)}.VerOffset"))
-        )
+        return float(self._scope.get(f"Acquisition.{str(self)}.VerOffset"))
 
     @vertical_offset.setter
     def vertical_offset(self, value: float) -> None:
-        self._scope._ask(_set_command(f"Acquisition.{str(self)}.VerOffset", value))
+        self._scope.set(f"Acquisition.{str(self)}.VerOffset", value)
 
     # TODO: add setter
     @property
     def vertical_coupling(self) -> str:
-        return self._scope._ask(_get_command(f"Acquisition.{str(self)}.Coupling"))
+        return self._scope.get(f"Acquisition.{str(self)}.Coupling")
 
     def find_scale(self) -> None:
         self._scope._ask(f"VBS? 'app.Acquisition.{str(self)}.FindScale()'")
+        self._scope.invalidate(
+            f"Acquisition.{str(self)}.VerScale", f"Acquisition.{str(self)}.VerOffset"
+        )
 
-    def read(self) -> Trace:
-        return self._scope.read(self.channel)
+    def read(self, header_only: bool = False, **waveform_setup) -> Trace:
+        return self._scope.read(self.channel, header_only=header_only, **waveform_setup)
+
+    def settings(self) -> dict[str, str]:
+        """
+        Returns the vertical scale, offset and coupling of the channel read in a single round trip
+        """
+        names = ["VerScale", "VerOffset", "Coupling"]
+        batch = self._scope.batch()
+        for name in names:
+            batch.get(f"Acquisition.{str(self)}.{name}")
+        values = batch.execute()
+        return dict(zip(names, values.values()))
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import re
+import struct
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import numpy
+
+from lecroyscope.reading.header import trc_description, _trc_dtype
+
+
+def _synthetic_header(samples: int, segments: int = 1) -> dict:
+    """
+    Returns a raw header (see `lecroyscope.writing.trc.write`) for a synthetic trace with `samples` points per segment
+    """
+    header = {name: b"" if fmt.endswith("s") else 0 for name, fmt in trc_description}
+    header.update(
+        descriptor_name=b"WAVEDESC",
+        template_name=b"LECROY_2_3",
+        instrument_name=b"LECROYSYNTHETIC",
+        points_per_screen=samples,
+        sparsing_factor=1,
+        sweeps_per_acq=1,
+        vertical_gain=1e-4,
+        vertical_offset=-0.5,
+        nominal_bits=8,
+        nom_subarray_count=segments,
+        horiz_interval=1e-9,
+        horiz_offset=-1e-7,
+        vert_unit=b"V",
+        horiz_unit=b"S",
+        trigger_time=(1.5, 30, 12, 1, 1, 2023, 0),
+        ris_sweeps=1,
+        time_base=14,
+        fixed_vert_gain=18,
+        probe_att=1.0,
+        vertical_vernier=1.0,
+    )
+    return header
+
+
+def synthetic_trc(
+    samples: int,
+    segments: int = 1,
+    word: bool = True,
+    endianness: str = "<",
+    channel: int = 1,
+    seed: int = 0,
+    sparsing: int = 0,
+    number_of_points: int = 0,
+    first_point: int = 0,
+    segment: int = 0,
+) -> bytes:
+    """
+    Returns the contents of a synthetic trc file with `segments` segments of `samples` random ADC values.
+    As for a scope transfer, byte values (`word` False) are the most significant byte of the word values and
+    `sparsing`, `number_of_points`, `first_point` and `segment` select part of the data (see `Scope.waveform_setup`)
+    """
+    from lecroyscope.writing.trc import write
+
+    rng = numpy.random.default_rng(seed)
+    values = rng.integers(
+        numpy.iinfo(numpy.int16).min,
+        numpy.iinfo(numpy.int16).max,
+        size=(segments, samples),
+    ).astype(numpy.int16)
+    header = _synthetic_header(samples, segments)
+    header["wave_source"] = channel - 1
+    if not word:
+        values = (values >> 8).astype(numpy.int8)
+        header["vertical_gain"] *= 256
+    trigger_times = numpy.zeros((2, segments))
+    trigger_times[0] = numpy.arange(segments) * 1e-3
+
+    values = values[:, first_point :: max(sparsing, 1)]
+    if number_of_points > 0:
+        values = values[:, :number_of_points]
+    header.update(first_point=first_point, sparsing_factor=max(sparsing, 1))
+    if segment > 0:
+        values = values[segment - 1]
+        header["horiz_offset"] += trigger_times[1, segment - 1]
+        trigger_times = None
+    elif segments == 1:
+        values = values[0]
+
+    buffer = BytesIO()
+    write(
+        buffer,
+        header,
+        values,
+        trigger_times=trigger_times if values.ndim == 2 else None,
+        endianness=endianness,
+    )
+    return buffer.getvalue()
+
+
+_assignment_regex = re.compile(r'^app\.(\S+) = "(.*)"$')
+_acquire_regex = re.compile(r"^app\.Acquisition\.acquire\(([^,]+), (\w+)\)$")
+# trigger time of the first acquisition, the time of each acquisition is written into the header of the waveforms
+_start_time = datetime(2023, 1, 1, 12, 30, 1, 500000)
+_trigger_time_offset = _trc_dtype["<"].fields["trigger_time"][1]
+_trigger_time_struct = struct.Struct("<dbbbbhh")
+
+_waveform_regex = re.compile(r"^C(\d+):WF\?")
+_comm_format_regex = re.compile(r"^CFMT DEF9,(BYTE|WORD),BIN$")
+_waveform_setup_regex = re.compile(r"^WFSU SP,(\d+),NP,(\d+),FP,(\d+),SN,(\d+)$")
+
+
+class SimulatedInstrument:
+    def __init__(
+        self,
+        samples: int = 10_000,
+        segments: int = 1,
+        word: bool = True,
+        channels: int = 4,
+        latency: float = 0.0,
+        transfer_rate: float | None = None,
+        trigger_rate: float | None = None,
+        seed: int = 0,
+    ):
+        """
+        In-process stand-in for `vxi11.Instrument` simulating a LeCroy oscilloscope, to be passed to `Scope` as
+        `instrument`. It answers '*IDN?', the 'VBS?' commands used by `Scope` and `Channel` (parameters are stored and
+        returned as strings) and 'C{n}:WF?' queries with synthetic trc data of `segments` segments of `samples` points.
+        The transfer format ('CFMT') and waveform setup ('WFSU') commands are also supported.
+
+        Each command takes `latency` seconds (round trip) and waveform transfers are limited to `transfer_rate`
+        bytes per second (if given). `acquire` triggers after 1 / `trigger_rate` seconds (immediately if not given).
+        """
+        self.timeout = 10.0
+        self.latency = latency
+        self.transfer_rate = transfer_rate
+        self.trigger_rate = trigger_rate
+        self._samples = samples
+        self._segments = segments
+        self._word = word
+        self._seed = seed
+        self._channels = channels
+        self._waveforms = dict()
+        # sparsing, number of points, first point and segment
+        self._waveform_setup = (0, 0, 0, 0)
+        self._pending = []
+        self.triggers = 0
+        self._trigger_time = _start_time
+        self.settings = {
+            "ExecsNameAll": ",".join(
+                [f"C{n}" for n in range(1, channels + 1)]
+                + [f"F{n}" for n in range(1, channels + 1)]
+            ),
+            "Acquisition.TriggerMode": "Stopped",
+            "Acquisition.Horizontal.SampleMode": "Sequence"
+            if segments > 1
+            else "RealTime",
+            "Acquisition.Horizontal.NumSegments": str(segments),
+        }
+        for n in range(1, channels + 1):
+            self.settings.update(
+                {
+                    f"Acquisition.C{n}.VerScale": "0.1",
+                    f"Acquisition.C{n}.VerOffset": "0",
+                    f"Acquisition.C{n}.Coupling": "DC50",
+                }
+            )
+
+    def close(self) -> None:
+        pass
+
+    def _waveform(self, channel: int) -> bytes:
+        key = (channel, self._word, self._waveform_setup)
+        if key not in self._waveforms:
+            sparsing, number_of_points, first_point, segment = self._waveform_setup
+            self._waveforms[key] = f"C{channel}:WF ALL,".encode(
+                "ascii"
+            ) + synthetic_trc(
+                self._samples,
+                self._segments,
+                word=self._word,
+                channel=channel,
+                seed=self._seed + channel,
+                sparsing=sparsing,
+                number_of_points=number_of_points,
+                first_point=first_point,
+                segment=segment,
+            )
+        return self._waveforms[key]
+
+    def _acquire(self, timeout: float) -> str:
+        if self.trigger_rate is not None:
+            wait = 1 / self.trigger_rate
+            if wait > timeout:
+                time.sleep(timeout)
+                return "0"
+            time.sleep(wait)
+        self._trigger_time = _start_time + timedelta(
+            seconds=self.triggers / (self.trigger_rate or 1000.0)
+        )
+        self.triggers += 1
+        return "1"
+
+    def _evaluate(self, expression: str) -> str:
+        match = _acquire_regex.match(expression)
+        if match is not None:
+            return self._acquire(float(match.group(1)))
+        values = []
+        for term in expression.split(" & "):
+            if term.startswith('"') and term.endswith('"'):
+                values.append(term[1:-1])
+                continue
+            if term.startswith("Chr(") and term.endswith(")"):
+                values.append(chr(int(term[4:-1])))
+                continue
+            if term.startswith("CStr(") and term.endswith(")"):
+                term = term[5:-1]
+            values.append(self.settings.get(term[len("app.") :], ""))
+        return "".join(values)
+
+    def _vbs(self, script: str) -> str:
+        response = "0"
+        for line in script.split("\n"):
+            line = line.strip()
+            match = _assignment_regex.match(line)
+            if match is not None:
+                self.settings[match.group(1)] = match.group(2)
+            elif line.startswith("return = "):
+                response = self._evaluate(line[len("return = ") :])
+        return response
+
+    def ask(self, command: str) -> str:
+        time.sleep(self.latency)
+        if command == "*IDN?":
+            return f"*IDN LECROY,SIMULATOR,{self._channels},0.0.0"
+        if command == "CFMT?":
+            return f"CFMT DEF9,{'WORD' if self._word else 'BYTE'},BIN"
+        if command.startswith("VBS? '") and command.endswith("'"):
+            return f"VBS {self._vbs(command[len('VBS? ') + 1 : -1])}"
+        raise ValueError(f"Unsupported command: {command}")
+
+    def write(self, command: str) -> None:
+        match = _comm_format_regex.match(command)
+        if match is not None:
+            self._word = match.group(1) == "WORD"
+            return
+        match = _waveform_setup_regex.match(command)
+        if match is not None:
+            self._waveform_setup = tuple(int(value) for value in match.groups())
+            if self._waveform_setup[3] > self._segments:
+                raise ValueError(f"Invalid segment: {self._waveform_setup[3]}")
+            return
+        match = _waveform_regex.match(command)
+        if match is None:
+            raise ValueError(f"Unsupported command: {command}")
+        channel = int(match.group(1))
+        if not 1 <= channel <= self._channels:
+            raise ValueError(f"Invalid channel: {channel}")
+        self._pending.append(channel)
+
+    def read_raw(self) -> bytes:
+        if len(self._pending) == 0:
+            raise ValueError("No pending waveform query")
+        data = self._waveform(self._pending.pop(0))
+        # copy the data as in a real transfer, with the trigger time of the last acquisition
+        offset = data.find(b"WAVEDESC") + _trigger_time_offset
+        t = self._trigger_time
+        trigger_time = _trigger_time_struct.pack(
+            t.second + t.microsecond * 1e-6, t.minute, t.hour, t.day, t.month, t.year, 0
+        )
+        view = memoryview(data)
+        data = b"".join(
+            [view[:offset], trigger_time, view[offset + len(trigger_time) :]]
+        )
+        delay = self.latency
+        if self.transfer_rate is not None:
+            delay += len(data) / self.transfer_rate
+        time.sleep(delay)
+        return data
@@ -1,4 +1,6 @@
 from .trace import Trace, _get_channel_trace_from_trc_filename
 from .file import read
 from .header import Header
-from .trace_group import TraceGroup
+from .trace_group import TraceGroup, load_traces
+from .catalog import read_headers
+from .run import Run
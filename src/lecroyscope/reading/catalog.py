@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from os import PathLike
+from glob import glob
+
+import numpy
+
+from .header import (
+    trc_description,
+    _trc_dtype,
+    _trc_struct,
+    _trc_decoders,
+    _comm_order_offset,
+)
+from .trace import _get_channel_trace_from_trc_filename
+
+# "WAVEDESC" is expected at the beginning of the file (after a short prefix such as '#9000000346')
+_header_search_size = 512
+
+
+def _read_header_block(filename: str | PathLike[str]) -> bytes:
+    """
+    Returns the raw bytes of the WAVEDESC block of a trc file
+    """
+    size = _trc_struct["<"].size
+    with open(filename, "rb") as f:
+        data = f.read(_header_search_size + size)
+        offset = data.find(b"WAVEDESC")
+        if offset < 0:
+            raise ValueError(
+                f"Could not find 'WAVEDESC' in the first bytes of {filename}"
+            )
+        block = data[offset : offset + size]
+        if len(block) < size:
+            block += f.read(size - len(block))
+    if len(block) < size:
+        raise ValueError(f"Trace file {filename} is too small to contain a header")
+    return block
+
+
+def _trigger_time_to_datetime64(trigger_time: numpy.ndarray) -> numpy.ndarray:
+    """
+    Converts the 'trigger_time' structured field into 'datetime64[us]' values
+    """
+    date = (
+        (trigger_time["year"].astype(numpy.int64) - 1970).astype("datetime64[Y]")
+        + (trigger_time["months"].astype(numpy.int64) - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (trigger_time["days"].astype(numpy.int64) - 1).astype(
+        "timedelta64[D]"
+    )
+    # same rounding as 'Header'
+    seconds = trigger_time["seconds"]
+    microseconds = (
+        trigger_time["hours"].astype(numpy.int64) * 3600
+        + trigger_time["minutes"].astype(numpy.int64) * 60
+        + seconds.astype(numpy.int64)
+    ) * 1_000_000 + ((seconds % 1) * 1e6).astype(numpy.int64)
+    return date.astype("datetime64[us]") + microseconds.astype("timedelta64[us]")
+
+
+def read_headers(*args: str | PathLike[str]) -> dict[str, numpy.ndarray]:
+    """
+    Reads only the header (WAVEDESC block) of many trc files and returns a columnar catalog: a dict with one array
+    per header field, with one entry per file.
+    Arguments can be filenames or glob patterns (e.g. 'run/C*Trace*.trc').
+
+    Besides the header fields, the catalog contains the 'filename' column and the 'channel' and 'trace_number' columns
+    obtained from the filename (-1 if the filename does not follow the 'C{n}Trace{NNNNN}.trc' pattern).
+    'trigger_time' is returned as 'datetime64[us]' and the rest of the fields are decoded as in `Header`.
+    """
+    filenames = []
+    for arg in args:
+        if "*" in str(arg):
+            filenames.extend(sorted(glob(str(arg))))
+        else:
+            filenames.append(str(arg))
+
+    size = _trc_struct["<"].size
+    blocks = numpy.empty((len(filenames), size), dtype=numpy.uint8)
+    for i, filename in enumerate(filenames):
+        blocks[i] = numpy.frombuffer(_read_header_block(filename), dtype=numpy.uint8)
+
+    # comm_order is 0 for big endian (HIFIRST) and 1 for little endian (LOFIRST)
+    big_endian = (blocks[:, _comm_order_offset] == 0) & (
+        blocks[:, _comm_order_offset + 1] == 0
+    )
+    # structured array with native byte order
+    headers = numpy.empty(len(filenames), dtype=_trc_dtype["="])
+    for endianness, selection in [("<", ~big_endian), (">", big_endian)]:
+        if numpy.any(selection):
+            headers[selection] = (
+                numpy.ascontiguousarray(blocks[selection])
+                .view(_trc_dtype[endianness])
+                .reshape(-1)
+            )
+
+    catalog = {}
+    for name, _ in trc_description:
+        column = headers[name]
+        if name == "trigger_time":
+            column = _trigger_time_to_datetime64(column)
+        elif name in _trc_decoders:
+            # decode each distinct value only once
+            unique, inverse = numpy.unique(column, return_inverse=True)
+            decoded = [
+                _trc_decoders[name](value.item() if column.dtype.kind != "S" else value)
+                for value in unique
+            ]
+            column = numpy.array(decoded, dtype=str)[inverse.reshape(-1)]
+        catalog[name] = column
+
+    channel_trace = [
+        _get_channel_trace_from_trc_filename(filename) or (-1, -1)
+        for filename in filenames
+    ]
+    catalog["filename"] = numpy.array(filenames, dtype=str)
+    catalog["channel"] = numpy.array([c for c, _ in channel_trace], dtype=numpy.int64)
+    catalog["trace_number"] = numpy.array(
+        [t for _, t in channel_trace], dtype=numpy.int64
+    )
+    return catalog
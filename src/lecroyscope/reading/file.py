@@ -1,128 +1,230 @@
-from __future__ import annotations
-
-import mmap
-from os import PathLike
-import struct
-import numpy
-from io import BytesIO
-from datetime import datetime
-
-from .header import trc_description
-
-
-def read(
-    filename_or_bytes: str | PathLike[str] | bytes, header_only: bool = False
-) -> tuple[dict[str, str | int | float], numpy.ndarray, numpy.ndarray]:
-    with open(filename_or_bytes, "r+b") if not isinstance(
-        filename_or_bytes, bytes
-    ) else BytesIO(filename_or_bytes) as f:
-        wavedesc_bytes = b"WAVEDESC"
-        # find "WAVEDESC" and skip those bytes
-        if isinstance(filename_or_bytes, bytes):
-            f.read(filename_or_bytes.find(wavedesc_bytes))
-        else:
-            # https://docs.python.org/3/library/mmap.html
-            mm = mmap.mmap(f.fileno(), 0)
-            f.read(mm.find(wavedesc_bytes))
-
-        header = {
-            name: f.read(struct.Struct(fmt).size) for (name, fmt) in trc_description
-        }
-
-        endianness = ">" if struct.unpack("h", header["comm_order"])[0] == 0 else "<"
-
-        header = {
-            name: struct.unpack(f"{endianness}{fmt}", header[name])
-            for (name, fmt) in trc_description
-        }
-
-        for name in header:
-            if name != "trigger_time":
-                header[name] = header[name][0]
-            else:
-                trigger_time = list(reversed(header["trigger_time"][:-1]))
-                microseconds = int((trigger_time[-1] % 1) * 1e6)
-                trigger_time = [int(t) for t in trigger_time]
-                trigger_time.append(microseconds)
-                header[name] = datetime(*trigger_time).isoformat()
-
-        # format strings
-        for name in header:
-            if isinstance(header[name], bytes):
-                header[name] = header[name].decode("ascii").strip("\x00")
-
-        # format some attributes in a more human-readable way
-        # https://github.com/neago/lecroy-reader/blob/49c42a85c449013c1c48d154ae70192f172e32ba/lecroyreader/lecroy.py
-        record_types = [
-            "single sweep",
-            "interleaved",
-            "histogram",
-            "graph",
-            "filter coefficient",
-            "complex",
-            "extrema",
-            "sequence obsolete",
-            "centered RIS",
-            "peak detect",
-        ]
-        header["record_type"] = record_types[header["record_type"]]
-
-        processing_types = [
-            "no processing",
-            "fir filter",
-            "interpolated",
-            "sparsed",
-            "autoscaled",
-            "no result",
-            "rolling",
-            "cumulative",
-        ]
-        header["processing_done"] = processing_types[header["processing_done"]]
-
-        vertical_couplings = [
-            "DC 50 Ohm",
-            "ground",
-            "DC 1 MOhm",
-            "ground",
-            "AC 1 MOhm",
-        ]
-        header["vert_coupling"] = vertical_couplings[header["vert_coupling"]]
-        time_base = header["time_base"]
-        if time_base == 100:
-            header["time_base"] = "external"
-        else:
-            value = [1, 2, 5, 10, 20, 50, 100, 200, 500][time_base % 9]
-            prefix = ["p", "n", "μ", "m", "", "k"][time_base // 9]
-            header["time_base"] = f"{value} {prefix}s / div"
-
-        fixed_vert_gain = header["fixed_vert_gain"]
-        value = [1, 2, 5, 10, 20, 50, 100, 200, 500][fixed_vert_gain % 9]
-        prefix = ["μ", "m", "", "k"][fixed_vert_gain // 9]
-        header["fixed_vert_gain"] = f"{value} {prefix}V / div"
-
-        # if header only return empty arrays
-        values_type = numpy.int8 if header["comm_type"] == 0 else numpy.int16
-        if not header_only:
-            if header["user_text"] != 0:
-                # skip user text
-                f.read(header["user_text"])
-
-            trigger_times = numpy.frombuffer(
-                f.read(int(header["trig_time_array"])), dtype=numpy.float64
-            )
-
-            number_of_bytes_to_read = (
-                int(header["wave_array_count"]) * values_type().itemsize
-            )
-            values = numpy.frombuffer(
-                f.read(number_of_bytes_to_read), dtype=values_type
-            )
-        else:
-            trigger_times = numpy.array([], dtype=numpy.float64)
-            values = numpy.array([], dtype=values_type)
-
-        trigger_times = trigger_times.reshape((2, -1), order="F")
-        if header["subarray_count"] > 1:
-            values = values.reshape((header["subarray_count"], -1), order="C")
-
-        return header, trigger_times, values
+from __future__ import annotations
+
+import mmap
+from contextlib import nullcontext
+from os import PathLike
+import numpy
+from typing import BinaryIO
+
+from .header import Header, _parse_header
+
+
+def read(
+    filename_or_bytes: str | PathLike[str] | bytes | bytearray | memoryview,
+    header_only: bool = False,
+    memory_map: bool = False,
+    segments: slice | None = None,
+) -> tuple[dict[str, str | int | float], numpy.ndarray, numpy.ndarray]:
+    """
+    Read a trc file (or the bytes of a scope readout) and return the header dict, the trigger times and the raw
+    ADC values.
+    When reading from memory (bytes, bytearray or memoryview) the returned arrays are views into the given buffer,
+    no data is copied.
+    If `memory_map` is True the file is memory mapped (read-only) and the returned arrays are views into the mapping
+    instead of copies. The mapping stays open as long as any of the returned arrays is alive.
+    For sequence traces, `segments` selects a subset of the segments (e.g. `slice(1000, 1100)`). Only the selected
+    segments and their trigger times are read from the file.
+    """
+    header, trigger_times, values, _ = _read(
+        filename_or_bytes, header_only, memory_map, segments
+    )
+    return dict(Header(header)), trigger_times, values
+
+
+def _read_segments(
+    f: BinaryIO, offset: int, count: int, dtype: numpy.dtype, segments: range
+) -> numpy.ndarray:
+    """
+    Read `count` values of type `dtype` for each segment in `segments` from a block of consecutive segments starting
+    at `offset`. Returns an array of shape (len(segments), count)
+    """
+    values = numpy.empty((len(segments), count), dtype=dtype)
+    segment_size = count * values.itemsize
+    if segments.step == 1:
+        f.seek(offset + segments.start * segment_size)
+        _read_into(f, values)
+    else:
+        for i, segment in enumerate(segments):
+            f.seek(offset + segment * segment_size)
+            _read_into(f, values[i])
+    return values
+
+
+def _read_into(f: BinaryIO, values: numpy.ndarray) -> None:
+    size = f.readinto(values)
+    if size != values.nbytes:
+        raise ValueError(
+            f"Unexpected end of file: read {size} bytes instead of {values.nbytes}"
+        )
+
+
+# types of in-memory data (e.g. a scope readout) which are read without copying
+_buffer_types = (bytes, bytearray, memoryview)
+
+# "WAVEDESC" is expected at the start of the data, after the block prefix (e.g. 'C1:WF ALL,#9000001234')
+_wavedesc_search_size = 512
+
+
+def _find_wavedesc(buffer) -> int:
+    offset = bytes(buffer[:_wavedesc_search_size]).find(b"WAVEDESC")
+    if offset < 0:
+        raise ValueError("Could not find the 'WAVEDESC' block of the trace")
+    return offset
+
+
+def _from_buffer(
+    buffer,
+    header: dict,
+    trigger_times_offset: int,
+    trigger_times_type: numpy.dtype,
+    values_type: numpy.dtype,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Returns the trigger times and values as views into `buffer` (bytes-like or mmap), no data is copied
+    """
+    size = (
+        trigger_times_offset
+        + int(header["trig_time_array"])
+        + int(header["wave_array_count"]) * values_type.itemsize
+    )
+    if len(buffer) < size:
+        raise ValueError(
+            f"Unexpected end of data: {len(buffer)} bytes instead of at least {size}"
+        )
+    trigger_times = numpy.frombuffer(
+        buffer,
+        dtype=trigger_times_type,
+        count=int(header["trig_time_array"]) // 8,
+        offset=trigger_times_offset,
+    )
+    values = numpy.frombuffer(
+        buffer,
+        dtype=values_type,
+        count=int(header["wave_array_count"]),
+        offset=trigger_times_offset + int(header["trig_time_array"]),
+    )
+    return trigger_times, values
+
+
+def _read(
+    filename_or_bytes: str | PathLike[str] | bytes | bytearray | memoryview,
+    header_only: bool = False,
+    memory_map: bool = False,
+    segments: slice | None = None,
+) -> tuple[
+    dict[str, str | int | float], numpy.ndarray, numpy.ndarray, mmap.mmap | None
+]:
+    """
+    Same as `read` but the header values are not decoded (see `Header`) and the `mmap.mmap` object backing the
+    arrays is also returned (None if not memory mapped)
+    """
+    if segments is not None and not isinstance(segments, slice):
+        raise ValueError(
+            f"Invalid segments: {segments}. Segments must be selected with a slice (e.g. 'slice(3, 4)')"
+        )
+    in_memory = isinstance(filename_or_bytes, _buffer_types)
+    if memory_map and in_memory:
+        raise ValueError("Memory mapping is only supported when reading from a file")
+
+    mm = None
+    try:
+        with open(filename_or_bytes, "rb") if not in_memory else nullcontext() as f:
+            if in_memory:
+                buffer = memoryview(filename_or_bytes).cast("B")
+            else:
+                # https://docs.python.org/3/library/mmap.html
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = mm
+            # find "WAVEDESC" and parse the header in place
+            wavedesc_offset = _find_wavedesc(buffer)
+            header = _parse_header(buffer, wavedesc_offset)
+
+            byte_order = ">" if header["comm_order"] == 0 else "<"
+            values_type = numpy.dtype(
+                numpy.int8 if header["comm_type"] == 0 else numpy.int16
+            ).newbyteorder(byte_order)
+            trigger_times_type = numpy.dtype(numpy.float64).newbyteorder(byte_order)
+            sequence = header["subarray_count"] > 1
+            if segments is not None and not sequence:
+                raise ValueError(
+                    "Segment selection is only supported for sequence traces"
+                )
+            if (
+                sequence
+                and not header_only
+                and int(header["wave_array_count"]) % header["subarray_count"] != 0
+            ):
+                # e.g. a transfer of a number of points ('WFSU NP') that does not cover whole segments
+                raise ValueError(
+                    f"Number of values ({header['wave_array_count']}) is not a multiple of the number of segments "
+                    f"({header['subarray_count']})"
+                )
+
+            # skip user text
+            trigger_times_offset = (
+                wavedesc_offset + header["wave_descriptor"] + header["user_text"]
+            )
+            values_offset = trigger_times_offset + int(header["trig_time_array"])
+            # views into the data are only sliced at the end
+            views = memory_map or in_memory
+            if header_only:
+                # if header only return empty arrays
+                trigger_times = numpy.array([], dtype=trigger_times_type)
+                values = numpy.array([], dtype=values_type)
+            elif views:
+                # views into the mapped file or the given buffer, no data is copied
+                trigger_times, values = _from_buffer(
+                    buffer,
+                    header,
+                    trigger_times_offset,
+                    trigger_times_type,
+                    values_type,
+                )
+            elif segments is not None:
+                # only read the selected segments
+                selected = range(header["subarray_count"])[segments]
+                trigger_times = _read_segments(
+                    f, trigger_times_offset, 2, trigger_times_type, selected
+                )
+                values = _read_segments(
+                    f,
+                    values_offset,
+                    int(header["wave_array_count"]) // header["subarray_count"],
+                    values_type,
+                    selected,
+                )
+            else:
+                f.seek(trigger_times_offset)
+                trigger_times = numpy.frombuffer(
+                    f.read(int(header["trig_time_array"])), dtype=trigger_times_type
+                )
+
+                number_of_bytes_to_read = (
+                    int(header["wave_array_count"]) * values_type.itemsize
+                )
+                values = numpy.frombuffer(
+                    f.read(number_of_bytes_to_read), dtype=values_type
+                )
+
+            if trigger_times.ndim == 1:
+                trigger_times = trigger_times.reshape((2, -1), order="F")
+            else:
+                # read segment by segment
+                trigger_times = trigger_times.T
+            if sequence and values.ndim == 1:
+                values = values.reshape((header["subarray_count"], -1), order="C")
+            if segments is not None and (views or header_only):
+                trigger_times = trigger_times[:, segments]
+                values = values[segments]
+    except BaseException:
+        if mm is not None:
+            # release the views into the mapping so it can be closed (an open mapping locks the file on Windows)
+            trigger_times = values = None
+            mm.close()
+        raise
+
+    if mm is not None and (not memory_map or header_only):
+        mm.close()
+        mm = None
+
+    return header, trigger_times, values, mm
@@ -1,3 +1,11 @@
+from __future__ import annotations
+
+import struct
+from datetime import datetime
+from typing import Callable
+
+import numpy
+
 # description from
 # https://github.com/neago/lecroy-reader/blob/49c42a85c449013c1c48d154ae70192f172e32ba/lecroyreader/lecroy.py#L4
 trc_description = (
@@ -61,22 +69,273 @@ trc_description = (
 
 _trc_description_fields = {name for name, _ in trc_description}
 
+# the whole WAVEDESC block is parsed with a single precompiled struct (one per endianness)
+_trc_format = "".join(fmt for _, fmt in trc_description)
+_trc_struct = {
+    endianness: struct.Struct(f"{endianness}{_trc_format}") for endianness in "<>="
+}
+
+
+_numpy_codes = {"h": "i2", "i": "i4", "f": "f4", "d": "f8", "b": "i1"}
+
+
+def _get_numpy_dtype(endianness: str) -> numpy.dtype:
+    """
+    Returns the NumPy structured dtype equivalent to the WAVEDESC block layout.
+    'trigger_time' is a nested structure with its components
+    """
+    fields = []
+    for name, fmt in trc_description:
+        if fmt.endswith("s"):
+            fields.append((name, f"S{fmt[:-1]}"))
+        elif len(fmt) == 1:
+            fields.append((name, f"{endianness}{_numpy_codes[fmt]}"))
+        else:
+            components = ["seconds", "minutes", "hours", "days", "months", "year"]
+            fields.append(
+                (
+                    name,
+                    [
+                        (component, f"{endianness}{_numpy_codes[code]}")
+                        for component, code in zip(components + ["unused"], fmt)
+                    ],
+                )
+            )
+    dtype = numpy.dtype(fields)
+    assert dtype.itemsize == _trc_struct[endianness].size
+    return dtype
+
+
+_trc_dtype = {endianness: _get_numpy_dtype(endianness) for endianness in "<>="}
+
+
+def _get_field_slices() -> dict[str, slice]:
+    """
+    Returns the position of each field in the flat tuple returned by unpacking the WAVEDESC block.
+    Only 'trigger_time' spans more than one value
+    """
+    slices = {}
+    position = 0
+    for name, fmt in trc_description:
+        size = len(struct.unpack(f"<{fmt}", bytes(struct.calcsize(f"<{fmt}"))))
+        slices[name] = slice(position, position + size)
+        position += size
+    return slices
+
+
+_trc_field_slices = _get_field_slices()
+_comm_order_offset = struct.calcsize(
+    "<" + "".join(fmt for name, fmt in trc_description[:3])
+)
+
+
+def _parse_header(buffer, offset: int = 0) -> dict:
+    """
+    Parse the WAVEDESC block starting at `offset` of `buffer` (bytes, mmap, ...).
+    Values are returned as stored in the file, they are decoded into a more human-readable format by `Header`
+    """
+    # comm_order is 0 for big endian (HIFIRST) and 1 for little endian (LOFIRST)
+    (comm_order,) = struct.unpack_from("<h", buffer, offset + _comm_order_offset)
+    endianness = ">" if comm_order == 0 else "<"
+    values = _trc_struct[endianness].unpack_from(buffer, offset)
+    header = {name: values[field] for name, field in _trc_field_slices.items()}
+    for name, value in header.items():
+        if len(value) == 1:
+            header[name] = value[0]
+    return header
+
+
+def _decode_string(value: bytes | str) -> str:
+    if isinstance(value, bytes):
+        value = value.decode("ascii").strip("\x00")
+    return value
+
+
+def _decode_trigger_time(value: tuple | str) -> str:
+    if isinstance(value, str):
+        return value
+    trigger_time = list(reversed(value[:-1]))
+    microseconds = int((trigger_time[-1] % 1) * 1e6)
+    trigger_time = [int(t) for t in trigger_time]
+    trigger_time.append(microseconds)
+    return datetime(*trigger_time).isoformat()
+
+
+def _decode_enum(names: list[str]) -> Callable[[int | str], str]:
+    def decode(value: int | str) -> str:
+        if isinstance(value, str):
+            return value
+        return names[value]
+
+    return decode
+
+
+# format some attributes in a more human-readable way
+# https://github.com/neago/lecroy-reader/blob/49c42a85c449013c1c48d154ae70192f172e32ba/lecroyreader/lecroy.py
+_record_types = [
+    "single sweep",
+    "interleaved",
+    "histogram",
+    "graph",
+    "filter coefficient",
+    "complex",
+    "extrema",
+    "sequence obsolete",
+    "centered RIS",
+    "peak detect",
+]
+
+_processing_types = [
+    "no processing",
+    "fir filter",
+    "interpolated",
+    "sparsed",
+    "autoscaled",
+    "no result",
+    "rolling",
+    "cumulative",
+]
+
+_vertical_couplings = [
+    "DC 50 Ohm",
+    "ground",
+    "DC 1 MOhm",
+    "ground",
+    "AC 1 MOhm",
+]
+
+
+def _decode_time_base(value: int | str) -> str:
+    if isinstance(value, str):
+        return value
+    if value == 100:
+        return "external"
+    number = [1, 2, 5, 10, 20, 50, 100, 200, 500][value % 9]
+    prefix = ["p", "n", "μ", "m", "", "k"][value // 9]
+    return f"{number} {prefix}s / div"
+
+
+def _decode_fixed_vert_gain(value: int | str) -> str:
+    if isinstance(value, str):
+        return value
+    number = [1, 2, 5, 10, 20, 50, 100, 200, 500][value % 9]
+    prefix = ["μ", "m", "", "k"][value // 9]
+    return f"{number} {prefix}V / div"
+
+
+_trc_decoders = {
+    **{name: _decode_string for name, fmt in trc_description if fmt.endswith("s")},
+    "trigger_time": _decode_trigger_time,
+    "record_type": _decode_enum(_record_types),
+    "processing_done": _decode_enum(_processing_types),
+    "vert_coupling": _decode_enum(_vertical_couplings),
+    "time_base": _decode_time_base,
+    "fixed_vert_gain": _decode_fixed_vert_gain,
+}
+
+
+# inverse of the decoders, used to write trc files from decoded header values
+def _encode_string(value: bytes | str) -> bytes:
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return value
+
+
+def _encode_trigger_time(value: tuple | str) -> tuple:
+    if not isinstance(value, str):
+        return value
+    trigger_time = datetime.fromisoformat(value)
+    # half a microsecond is added so that decoding truncates to the same microsecond
+    seconds = trigger_time.second + (trigger_time.microsecond + 0.5) / 1e6
+    return (
+        seconds,
+        trigger_time.minute,
+        trigger_time.hour,
+        trigger_time.day,
+        trigger_time.month,
+        trigger_time.year,
+        0,
+    )
+
+
+def _encode_enum(names: list[str]) -> Callable[[int | str], int]:
+    def encode(value: int | str) -> int:
+        if not isinstance(value, str):
+            return value
+        return names.index(value)
+
+    return encode
+
+
+def _encode_per_division(value: str, unit: str, prefixes: list[str]) -> int:
+    number, prefix_unit, _, _ = value.split(" ")
+    number = [1, 2, 5, 10, 20, 50, 100, 200, 500].index(int(number))
+    prefix = prefixes.index(prefix_unit[: -len(unit)])
+    return prefix * 9 + number
+
+
+def _encode_time_base(value: int | str) -> int:
+    if not isinstance(value, str):
+        return value
+    if value == "external":
+        return 100
+    return _encode_per_division(value, "s", ["p", "n", "μ", "m", "", "k"])
+
+
+def _encode_fixed_vert_gain(value: int | str) -> int:
+    if not isinstance(value, str):
+        return value
+    return _encode_per_division(value, "V", ["μ", "m", "", "k"])
+
+
+_trc_encoders = {
+    **{name: _encode_string for name, fmt in trc_description if fmt.endswith("s")},
+    "trigger_time": _encode_trigger_time,
+    "record_type": _encode_enum(_record_types),
+    "processing_done": _encode_enum(_processing_types),
+    "vert_coupling": _encode_enum(_vertical_couplings),
+    "time_base": _encode_time_base,
+    "fixed_vert_gain": _encode_fixed_vert_gain,
+}
+
+
+def _pack_header(header: dict | Header, endianness: str) -> bytes:
+    """
+    Returns the WAVEDESC block for the header values (raw or decoded). 'comm_order' is set according to `endianness`
+    """
+    header = dict(header._raw) if isinstance(header, Header) else dict(header)
+    header["comm_order"] = 0 if endianness == ">" else 1
+    values = []
+    for name, _ in trc_description:
+        value = header[name]
+        if name in _trc_encoders:
+            value = _trc_encoders[name](value)
+        values.extend(value if isinstance(value, tuple) else (value,))
+    return _trc_struct[endianness].pack(*values)
+
 
 class Header:
     def __init__(self, header: dict) -> None:
-        for name in _trc_description_fields:
-            setattr(self, f"_{name}", header[name])
+        # header can contain raw values (as returned by '_parse_header') or already decoded values
+        # raw values are kept (to write them back without loss) and decoded on first access
+        self._raw = {name: header[name] for name, _ in trc_description}
+        self._decoded = dict()
 
     def __iter__(self):
-        for name in _trc_description_fields:
-            yield name, getattr(self, f"_{name}")
+        for name, _ in trc_description:
+            yield name, self[name]
 
     def __getitem__(self, item):
         if item not in _trc_description_fields:
             raise KeyError(
                 f"Invalid header field: {item}. Valid fields are: {_trc_description_fields}"
             )
-        return getattr(self, f"_{item}")
+        if item not in self._decoded:
+            value = self._raw[item]
+            if item in _trc_decoders:
+                value = _trc_decoders[item](value)
+            self._decoded[item] = value
+        return self._decoded[item]
 
     def __str__(self):
         return f"""Instrument name: {self["instrument_name"]}
@@ -101,6 +360,6 @@ for _name in _trc_description_fields:
     setattr(
         Header,
         _name,
-        property(lambda self, name=_name: getattr(self, f"_{name}")),
+        property(lambda self, name=_name: self[name]),
     )
 del _name
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+from itertools import islice
+from os import PathLike
+from pathlib import Path
+from typing import Iterator
+
+import numpy
+import numpy.typing
+
+from .trace import _get_channel_trace_from_trc_filename
+from .trace_group import TraceGroup
+
+
+class Run:
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        channels: list[int] | None = None,
+        prefetch: int = 1,
+        dtype: numpy.typing.DTypeLike = numpy.float64,
+    ) -> None:
+        """
+        A run is a collection of trc files named 'C{n}Trace{NNNNN}.trc', where all channels with the same trace number
+        belong to the same event (trigger).
+        `path` can be a directory or a glob pattern. Files are indexed by trace number but only read when iterating,
+        one `TraceGroup` per event.
+
+        If `channels` is given only these channels are read and only events containing all of them are included.
+        Up to `prefetch` events are read ahead in a background thread while the current one is processed
+        (0 disables prefetching).
+        """
+        if prefetch < 0:
+            raise ValueError("Prefetch must be a non-negative integer")
+        self._prefetch = prefetch
+        self._dtype = dtype
+
+        path = Path(path)
+        pattern = str(path / "C*Trace*.trc") if path.is_dir() else str(path)
+
+        index = dict()
+        for filename in glob(pattern):
+            channel_trace = _get_channel_trace_from_trc_filename(filename)
+            if channel_trace is None:
+                continue
+            channel, trace_number = channel_trace
+            if channels is not None and channel not in channels:
+                continue
+            index.setdefault(trace_number, dict())[channel] = filename
+
+        if channels is not None:
+            index = {
+                trace_number: event
+                for trace_number, event in index.items()
+                if len(event) == len(set(channels))
+            }
+
+        # sort by trace number and channel
+        self._index = {
+            trace_number: dict(sorted(index[trace_number].items()))
+            for trace_number in sorted(index)
+        }
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, trace_number: int) -> bool:
+        return trace_number in self._index
+
+    def __getitem__(self, trace_number: int) -> TraceGroup:
+        if trace_number not in self._index:
+            raise KeyError(f"Run does not contain trace number {trace_number}")
+        return TraceGroup(*self._index[trace_number].values(), dtype=self._dtype)
+
+    def __iter__(self) -> Iterator[TraceGroup]:
+        if self._prefetch == 0:
+            for trace_number in self._index:
+                yield self[trace_number]
+            return
+
+        trace_numbers = iter(self._index)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = deque(
+                executor.submit(self.__getitem__, trace_number)
+                for trace_number in islice(trace_numbers, self._prefetch)
+            )
+            while pending:
+                future = pending.popleft()
+                for trace_number in islice(trace_numbers, 1):
+                    pending.append(executor.submit(self.__getitem__, trace_number))
+                yield future.result()
+
+    @property
+    def trace_numbers(self) -> list[int]:
+        return list(self._index.keys())
+
+    @property
+    def channels(self) -> list[int]:
+        """
+        Returns all channels present in the run
+        """
+        return sorted({channel for event in self._index.values() for channel in event})
+
+    @property
+    def filenames(self) -> dict[int, dict[int, str]]:
+        """
+        Returns the filenames of the run as a dict {trace_number: {channel: filename}}
+        """
+        return {
+            trace_number: dict(event) for trace_number, event in self._index.items()
+        }
@@ -4,8 +4,9 @@ from os import PathLike
 from pathlib import Path
 import re
 import numpy
+import numpy.typing
 
-from .file import read
+from .file import _read, _buffer_types
 from .header import Header
 
 
@@ -28,28 +29,50 @@ def _get_channel_trace_from_trc_filename(
         return None
 
     channel = int(match.group(1))
-    trace_number = int(match.group(2).lstrip("0"))
+    trace_number = int(match.group(2))
     return channel, trace_number
 
 
 class Trace:
     def __init__(
         self,
-        filename_or_bytes: str | PathLike[str] | bytes,
+        filename_or_bytes: str | PathLike[str] | bytes | bytearray | memoryview,
         header_only: bool = False,
         channel: int | None = None,
+        memory_map: bool = False,
+        dtype: numpy.typing.DTypeLike = numpy.float64,
+        segments: slice | None = None,
     ):
+        """
+        If `memory_map` is True the trace file is memory mapped (read-only) and the raw ADC values and trigger times
+        are kept as views into the mapped file instead of being copied into memory.
+        The mapping is released with `close()` or when used as a context manager.
+
+        `dtype` is the floating point type of the `voltage` and `time` arrays (e.g. `numpy.float32` to halve memory
+        usage). The raw integer values are available via `adc_values`.
+
+        For sequence traces, `segments` selects a subset of the segments (e.g. `slice(1000, 1100)`) so that only those
+        segments (and their trigger times) are read.
+        """
+        self._dtype = numpy.dtype(dtype)
+        if self._dtype.kind != "f":
+            raise ValueError(
+                f"Invalid dtype: {self._dtype}. Trace dtype must be a floating point type, use 'adc_values' for the raw integer values"
+            )
+
         self._filename = (
-            filename_or_bytes if not isinstance(filename_or_bytes, bytes) else ""
+            filename_or_bytes
+            if not isinstance(filename_or_bytes, _buffer_types)
+            else ""
         )
 
         self._channel = None
         if channel is not None:
             self.channel = channel
         else:
-            if isinstance(filename_or_bytes, bytes):
+            if isinstance(filename_or_bytes, _buffer_types):
                 try:
-                    channel_string = filename_or_bytes[0:5].decode("ascii")
+                    channel_string = bytes(filename_or_bytes[0:5]).decode("ascii")
                     regex = re.compile(r"C(\d+):WF")
                     match = regex.match(channel_string)
                     if match:
@@ -62,36 +85,61 @@ class Trace:
                 if channel_trace is not None:
                     self.channel = channel_trace[0]
 
-        header, self._trigger_times, self._voltage = read(
-            filename_or_bytes, header_only
+        header, self._trigger_times, self._values, self._mmap = _read(
+            filename_or_bytes, header_only, memory_map, segments
         )
         self._header = Header(header)
+        self._shape = self._values.shape
+        # raw values are the source of truth and are exposed as 'adc_values'
+        self._values.flags.writeable = False
+
+        # voltage and time arrays are computed from the raw values on first access
+        self._voltage = None
+        self._time = None
+
+    def __enter__(self) -> Trace:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the memory mapped file backing this trace (if any).
+        Arrays that were already computed (e.g. `voltage`) remain valid, but arrays that need the raw values can no
+        longer be computed.
+        """
+        if self._mmap is None:
+            return
+        self._values = None
+        self._trigger_times = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # arrays returned to the caller still reference the mapping, it is released once they are garbage collected
+            pass
+        self._mmap = None
 
-        # store values in voltage units
-        self._voltage = self._voltage * self.header["vertical_gain"]
-        self._voltage = self._voltage - self.header["vertical_offset"]
-
-        # compute time values
-        self._time = (
-            numpy.arange(self._voltage.shape[-1]) * self.header["horiz_interval"]
-            + self.header["horiz_offset"]
-        )
+    @property
+    def memory_mapped(self) -> bool:
+        return self._mmap is not None
 
-        assert (
-            self._voltage.shape[-1] == self._time.shape[-1]
-        ), "Time and voltage arrays must have the same length"
+    def _check_open(self) -> None:
+        if self._values is None:
+            raise ValueError("Trace memory mapped file has been closed")
 
     def __len__(self):
         if not self._header.sequence:
             return 1
-        return len(self._voltage)
+        return self._shape[0]
 
     def __iter__(self):
-        if len(self) == 1:
-            yield self._time, self._voltage
+        # a sequence with a single (selected) segment still yields its segment as a 1D waveform
+        if len(self._shape) == 1:
+            yield self.time, self.voltage
         else:
-            for single in self._voltage:
-                yield self._time, single
+            for single in self.voltage:
+                yield self.time, single
 
     @property
     def header(self) -> Header:
@@ -99,7 +147,11 @@ class Trace:
 
     @property
     def header_only(self) -> bool:
-        return self._voltage.size == 0
+        return self._shape[-1] == 0
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self._dtype
 
     @property
     def sequence(self) -> bool:
@@ -117,29 +169,60 @@ class Trace:
 
     @property
     def voltage(self) -> numpy.ndarray:
+        if self._voltage is None:
+            self._check_open()
+            # store values in voltage units
+            voltage = numpy.multiply(
+                self._values, self.header["vertical_gain"], dtype=self._dtype
+            )
+            voltage -= self._dtype.type(self.header["vertical_offset"])
+            self._voltage = voltage
         return self._voltage
 
     @property
     def adc_values(self) -> numpy.ndarray:
-        return numpy.array(
-            (self._voltage + self.header["vertical_offset"])
-            / self.header["vertical_gain"],
-            dtype=int,
-        )
+        """
+        Raw (int8 or int16) ADC values as stored in the trace file. The returned array is read-only
+        """
+        self._check_open()
+        return self._values
 
     @property
     def trigger_times(self) -> numpy.ndarray:
+        self._check_open()
         return self._trigger_times
 
+    @property
+    def sampling_interval(self) -> float:
+        """
+        Time between consecutive values, taking into account the sparsing factor of the transfer (see 'WFSU')
+        """
+        return self.header["horiz_interval"] * max(self.header["sparsing_factor"], 1)
+
+    @property
+    def time_offset(self) -> float:
+        """
+        Time of the first value, taking into account the first point of the transfer (see 'WFSU')
+        """
+        return (
+            self.header["horiz_offset"]
+            + self.header["first_point"] * self.header["horiz_interval"]
+        )
+
     @property
     def time(self) -> numpy.ndarray:
+        if self._time is None:
+            time = numpy.arange(self._shape[-1], dtype=self._dtype)
+            time *= self._dtype.type(self.sampling_interval)
+            time += self._dtype.type(self.time_offset)
+            self._time = time
         return self._time
 
     # Alternative names
     @property
     def x(self) -> numpy.ndarray:
-        return self._time
+        return self.time
 
     @property
     def y(self) -> numpy.ndarray:
-        return self._voltage
+        return self.voltage
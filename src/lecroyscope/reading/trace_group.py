@@ -1,47 +1,90 @@
 from __future__ import annotations
 
 from os import PathLike
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Iterable
 
 import numpy
+import numpy.typing
 
 from pathlib import Path
 from glob import glob
 
+from .file import _buffer_types
 from .trace import Trace
 
 
+def load_traces(
+    sources: Iterable[str | PathLike[str] | bytes],
+    workers: int | None = None,
+    executor: Executor | None = None,
+    **kwargs,
+) -> list[Trace]:
+    """
+    Constructs a `Trace` from each filename or bytes in `sources`, returning them in the same order.
+    Traces are read concurrently using `executor` (e.g. a `concurrent.futures.ProcessPoolExecutor`) if given, otherwise
+    using a thread pool of `workers` threads. If neither is given traces are read sequentially.
+    Additional keyword arguments are forwarded to `Trace` (memory mapped traces cannot be used with a process pool).
+    """
+    load = partial(Trace, **kwargs)
+    if executor is not None:
+        return list(executor.map(load, sources))
+    if workers is None or workers <= 1:
+        return [load(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load, sources))
+
+
 class TraceGroup:
-    def __init__(self, *args: str | PathLike[str] | Trace | bytes) -> None:
-        self._traces = dict()
+    def __init__(
+        self,
+        *args: str | PathLike[str] | Trace | bytes | bytearray | memoryview,
+        dtype: numpy.typing.DTypeLike = numpy.float64,
+        workers: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        `dtype` is forwarded to the traces constructed from filenames or bytes, `Trace` arguments are used as they are.
+        Traces can be read concurrently by setting `workers` or `executor` (see `load_traces`)
+        """
+        sources = []
         for arg in args:
-            traces = []
-            if isinstance(arg, Trace):
-                traces = [arg]
-            elif isinstance(arg, bytes):
-                trace = Trace(arg)
-                if trace.channel is None:
-                    raise ValueError(
-                        "Trace group cannot be constructed from bytes without channel number"
-                    )
-                traces.append(trace)
+            if isinstance(arg, (Trace, *_buffer_types)):
+                sources.append(arg)
             else:
                 # is pathlike string
                 path = Path(arg)
                 if "*" in str(path):
-                    traces = [Trace(filename) for filename in glob(str(path))]
+                    sources.extend(glob(str(path)))
                 else:
-                    traces = [Trace(arg)]
+                    sources.append(arg)
 
-            for trace in traces:
-                if trace.channel is None:
-                    raise ValueError("Trace must have a channel number")
+        loaded = iter(
+            load_traces(
+                [source for source in sources if not isinstance(source, Trace)],
+                workers=workers,
+                executor=executor,
+                dtype=dtype,
+            )
+        )
 
-                if trace.channel in self._traces:
+        self._traces = dict()
+        for source in sources:
+            trace = source if isinstance(source, Trace) else next(loaded)
+            if trace.channel is None:
+                if isinstance(source, _buffer_types):
                     raise ValueError(
-                        f"Channel {trace.channel} already exists in trace group"
+                        "Trace group cannot be constructed from bytes without channel number"
                     )
+                raise ValueError("Trace must have a channel number")
 
-                self._traces[trace.channel] = trace
+            if trace.channel in self._traces:
+                raise ValueError(
+                    f"Channel {trace.channel} already exists in trace group"
+                )
+
+            self._traces[trace.channel] = trace
 
         # sort by channel number
         self._traces = dict(sorted(self._traces.items()))
@@ -94,3 +137,30 @@ class TraceGroup:
     @property
     def x(self) -> numpy.ndarray | None:
         return self.time
+
+
+def _get_trace_group(trace_or_group: Trace | TraceGroup) -> TraceGroup:
+    if isinstance(trace_or_group, TraceGroup):
+        return trace_or_group
+    elif isinstance(trace_or_group, Trace):
+        return TraceGroup(trace_or_group)
+    raise ValueError(
+        "Input argument should be either 'lecroyscope.Trace' or 'lecroyscope.TraceGroup'"
+    )
+
+
+def _segment_trigger_times(
+    trace_group: TraceGroup,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Returns the trigger time and trigger offset of each segment of the trace group (zeros for single traces)
+    """
+    trace = next(trace_group)
+    if trace.sequence:
+        trigger_time, trigger_offset = trace.trigger_times
+    else:
+        trigger_time = trigger_offset = numpy.zeros(trace_group.trace_length)
+    return (
+        numpy.asarray(trigger_time, dtype=numpy.float64),
+        numpy.asarray(trigger_offset, dtype=numpy.float64),
+    )
@@ -1 +1,16 @@
-from .root import tree
+from . import trc
+
+try:
+    from .root import tree
+except ImportError:
+    pass
+
+try:
+    from . import arrow
+except ImportError:
+    pass
+
+try:
+    from . import hdf5
+except ImportError:
+    pass
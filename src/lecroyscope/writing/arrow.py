@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from datetime import datetime
+from os import PathLike
+from pathlib import Path
+from typing import Iterable
+
+import numpy
+import pyarrow
+import pyarrow.parquet
+
+from lecroyscope import Trace, TraceGroup, Run
+from lecroyscope.reading.trace_group import _get_trace_group, _segment_trigger_times
+
+
+def _fixed_size_list(values: numpy.ndarray) -> pyarrow.FixedSizeListArray:
+    """
+    Wraps a 2D array (segments, points) into a fixed size list array without copying (if contiguous and native)
+    """
+    values = numpy.ascontiguousarray(values, dtype=values.dtype.newbyteorder("="))
+    return pyarrow.FixedSizeListArray.from_arrays(
+        pyarrow.array(values.reshape(-1)), values.shape[-1]
+    )
+
+
+def record_batch(
+    trace_or_group: Trace | TraceGroup, adc_values: bool = False
+) -> pyarrow.RecordBatch:
+    """
+    Returns a record batch with one row per segment of the trace (group).
+    Waveforms are stored as fixed size list columns "CHx" (one per channel) which reference the NumPy arrays of the
+    traces without copying. If `adc_values` is True the raw (int8 or int16) ADC values are stored instead of the
+    voltage (voltage = adc_value * vertical_gain - vertical_offset).
+
+    The rest of the columns are: "segment", "acquisition_time" (header 'trigger_time'), "horiz_interval" and
+    "horiz_offset" (time = index * horiz_interval + horiz_offset), "trigger_time" and "trigger_offset" of each segment
+    and "CHx_vertical_gain" and "CHx_vertical_offset" for each channel.
+    """
+    trace_group = _get_trace_group(trace_or_group)
+    if trace_group.time is None:
+        raise ValueError(
+            "Trace Group does not have unified time information (probably do not come from the same trigger)"
+        )
+    length = trace_group.trace_length
+    trace = next(trace_group)
+    trigger_time, trigger_offset = _segment_trigger_times(trace_group)
+
+    columns = {
+        "segment": pyarrow.array(numpy.arange(length, dtype=numpy.int32)),
+        "acquisition_time": pyarrow.array(
+            length * [datetime.fromisoformat(trace.header["trigger_time"])],
+            type=pyarrow.timestamp("us"),
+        ),
+        "horiz_interval": pyarrow.array(numpy.full(length, trace.sampling_interval)),
+        "horiz_offset": pyarrow.array(numpy.full(length, trace.time_offset)),
+        "trigger_time": pyarrow.array(trigger_time),
+        "trigger_offset": pyarrow.array(trigger_offset),
+    }
+    for trace in trace_group:
+        values = trace.adc_values if adc_values else trace.voltage
+        columns[f"CH{trace.channel}"] = _fixed_size_list(values.reshape((length, -1)))
+        columns[f"CH{trace.channel}_vertical_gain"] = pyarrow.array(
+            numpy.full(length, trace.header["vertical_gain"])
+        )
+        columns[f"CH{trace.channel}_vertical_offset"] = pyarrow.array(
+            numpy.full(length, trace.header["vertical_offset"])
+        )
+
+    return pyarrow.RecordBatch.from_pydict(columns)
+
+
+def write_parquet(
+    filename: str | PathLike[str],
+    source: Run | str | PathLike[str] | Iterable[Trace | TraceGroup],
+    adc_values: bool = False,
+    **kwargs,
+) -> int:
+    """
+    Writes all the events of `source` into a Parquet file and returns the number of rows written.
+    `source` can be a trace (group), a `Run`, a directory / glob pattern (used to create a `Run`) or any iterable of
+    traces or trace groups. Events are converted with `record_batch` (with an additional "event" column) and written
+    one at a time. Additional keyword arguments are forwarded to `pyarrow.parquet.ParquetWriter` (e.g. `compression`).
+    """
+    if isinstance(source, (str, Path)):
+        source = Run(source)
+    elif isinstance(source, (Trace, TraceGroup)):
+        source = [source]
+
+    rows = 0
+    writer = None
+    try:
+        for event, trace_or_group in enumerate(source):
+            batch = record_batch(trace_or_group, adc_values=adc_values)
+            batch = batch.add_column(
+                0,
+                "event",
+                pyarrow.array(numpy.full(batch.num_rows, event, dtype=numpy.int64)),
+            )
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(filename, batch.schema, **kwargs)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def read_parquet(
+    filename: str | PathLike[str],
+    columns: list[str] | None = None,
+    voltage: bool = True,
+) -> dict[str, numpy.ndarray]:
+    """
+    Reads a Parquet file written with `write_parquet` into a dict of NumPy arrays.
+    Waveform columns are returned as 2D arrays (rows, points). If the file contains raw ADC values and `voltage` is
+    True they are converted into voltage using the "CHx_vertical_gain" and "CHx_vertical_offset" columns.
+    """
+    table = pyarrow.parquet.read_table(filename, columns=columns)
+    data = dict()
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pyarrow.types.is_fixed_size_list(column.type):
+            values = column.flatten().to_numpy(zero_copy_only=False)
+            data[name] = values.reshape((len(column), column.type.list_size))
+        else:
+            data[name] = column.to_numpy(zero_copy_only=False)
+
+    if voltage:
+        for name in list(data):
+            gain, offset = f"{name}_vertical_gain", f"{name}_vertical_offset"
+            if data[name].ndim == 2 and data[name].dtype.kind == "i" and gain in data:
+                data[name] = (
+                    data[name] * data[gain][:, numpy.newaxis]
+                    - data[offset][:, numpy.newaxis]
+                )
+    return data
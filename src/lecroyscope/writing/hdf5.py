@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+from os import PathLike
+from pathlib import Path
+from typing import Iterable
+
+import h5py
+import numpy
+
+from lecroyscope import Trace, TraceGroup, Run
+from lecroyscope.reading.trace_group import _get_trace_group, _segment_trigger_times
+from lecroyscope.reading.header import _pack_header, _trc_dtype
+
+
+# target size of the chunks of the 'CHx/values' datasets, the default chunk cache of HDF5 holds 1 MiB per dataset
+_chunk_bytes = 1024 * 1024
+# rows per chunk of the one value per row datasets
+_scalar_chunk_rows = 1024
+
+
+def _append(dataset: h5py.Dataset, values: numpy.ndarray) -> None:
+    start = dataset.shape[0]
+    dataset.resize(start + len(values), axis=0)
+    dataset[start:] = values
+
+
+class HDF5Writer:
+    def __init__(
+        self,
+        filename: str | PathLike[str],
+        mode: str = "a",
+        adc_values: bool = False,
+        chunk_rows: int | None = None,
+        compression: str | None = "gzip",
+    ) -> None:
+        """
+        Writes events (traces or trace groups) into an HDF5 file. Each channel is stored as a chunked 2D dataset
+        'CHx/values' (segments x points) which grows as events are appended, so events can later be read at random
+        with `read_hdf5`. Header fields of each event are stored in the 'CHx/header' compound dataset.
+        The time axis of each row is stored in the 'horiz_interval' and 'horiz_offset' datasets
+        (time = index * horiz_interval + horiz_offset), so events with a different timebase can be appended.
+        Rows (segments) are stored in chunks of `chunk_rows` rows, by default as many as fit in 1 MiB (at least one)
+        so a chunk fits in the chunk cache of HDF5 when appending or reading single events.
+        If `adc_values` is True the raw (int8 or int16) ADC values are stored instead of the voltage
+        (voltage = adc_value * vertical_gain - vertical_offset, see 'CHx/vertical_gain' and 'CHx/vertical_offset').
+        An existing file is appended to when opened with mode "a".
+        """
+        self._file = h5py.File(filename, mode)
+        self._adc_values = adc_values
+        self._chunk_rows = chunk_rows
+        self._compression = compression
+        if "event_offsets" in self._file and self._file.attrs["adc_values"] != bool(
+            adc_values
+        ):
+            raise ValueError(
+                "Cannot append to a file with a different 'adc_values' option"
+            )
+
+    def __enter__(self) -> HDF5Writer:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of events in the file
+        """
+        if "event_offsets" not in self._file:
+            return 0
+        return len(self._file["event_offsets"]) - 1
+
+    def _dtype(self, trace: Trace) -> numpy.dtype:
+        if self._adc_values:
+            return trace.adc_values.dtype.newbyteorder("=")
+        return numpy.dtype(trace.dtype)
+
+    def _create(self, trace_group: TraceGroup) -> None:
+        f = self._file
+        points = len(trace_group.time)
+        f.attrs["adc_values"] = self._adc_values
+        f.attrs["points"] = points
+        f.create_dataset("event_offsets", data=[0], maxshape=(None,), dtype="i8")
+        for name in [
+            "horiz_interval",
+            "horiz_offset",
+            "trigger_time",
+            "trigger_offset",
+        ]:
+            f.create_dataset(
+                name,
+                shape=(0,),
+                maxshape=(None,),
+                dtype="f8",
+                chunks=(_scalar_chunk_rows,),
+            )
+        for trace in trace_group:
+            group = f.create_group(f"CH{trace.channel}")
+            dtype = self._dtype(trace)
+            chunk_rows = self._chunk_rows
+            if chunk_rows is None:
+                chunk_rows = max(1, _chunk_bytes // (points * dtype.itemsize))
+            group.create_dataset(
+                "values",
+                shape=(0, points),
+                maxshape=(None, points),
+                dtype=dtype,
+                chunks=(chunk_rows, points),
+                compression=self._compression,
+            )
+            for name in ["vertical_gain", "vertical_offset"]:
+                group.create_dataset(
+                    name,
+                    shape=(0,),
+                    maxshape=(None,),
+                    dtype="f8",
+                    chunks=(_scalar_chunk_rows,),
+                )
+            group.create_dataset(
+                "header", shape=(0,), maxshape=(None,), dtype=_trc_dtype["<"]
+            )
+
+    def append(self, trace_or_group: Trace | TraceGroup) -> None:
+        """
+        Appends an event (all the segments of the trace or trace group)
+        """
+        trace_group = _get_trace_group(trace_or_group)
+        if trace_group.time is None:
+            raise ValueError(
+                "Trace Group does not have unified time information (probably do not come from the same trigger)"
+            )
+        if "event_offsets" not in self._file:
+            self._create(trace_group)
+
+        f = self._file
+        channels = [f"CH{trace.channel}" for trace in trace_group]
+        if sorted(channels) != sorted(name for name in f if name.startswith("CH")):
+            raise ValueError(
+                f"Channels {channels} do not match the channels of the file"
+            )
+        if len(trace_group.time) != f.attrs["points"]:
+            raise ValueError(
+                f"Number of points ({len(trace_group.time)}) does not match the file ({f.attrs['points']})"
+            )
+        for trace in trace_group:
+            dtype = f[f"CH{trace.channel}"]["values"].dtype
+            if self._dtype(trace) != dtype:
+                raise ValueError(
+                    f"Data type of channel {trace.channel} ({self._dtype(trace)}) does not match the file ({dtype})"
+                )
+
+        length = trace_group.trace_length
+        trigger_time, trigger_offset = _segment_trigger_times(trace_group)
+        trace = next(trace_group)
+        _append(f["horiz_interval"], numpy.full(length, trace.sampling_interval))
+        _append(f["horiz_offset"], numpy.full(length, trace.time_offset))
+        _append(f["trigger_time"], trigger_time)
+        _append(f["trigger_offset"], trigger_offset)
+
+        for trace in trace_group:
+            group = f[f"CH{trace.channel}"]
+            values = trace.adc_values if self._adc_values else trace.voltage
+            _append(group["values"], values.reshape((length, -1)))
+            _append(
+                group["vertical_gain"],
+                numpy.full(length, trace.header["vertical_gain"]),
+            )
+            _append(
+                group["vertical_offset"],
+                numpy.full(length, trace.header["vertical_offset"]),
+            )
+            _append(
+                group["header"],
+                numpy.frombuffer(
+                    _pack_header(trace.header, "<"), dtype=_trc_dtype["<"]
+                ),
+            )
+
+        event_offsets = f["event_offsets"]
+        _append(event_offsets, [event_offsets[-1] + length])
+
+    def extend(
+        self, source: Run | str | PathLike[str] | Iterable[Trace | TraceGroup]
+    ) -> int:
+        """
+        Appends all the events of `source` (a `Run`, a directory / glob pattern or an iterable of traces or trace
+        groups) and returns the number of events appended
+        """
+        if isinstance(source, (str, Path)):
+            source = Run(source)
+        elif isinstance(source, (Trace, TraceGroup)):
+            source = [source]
+        events = 0
+        for trace_or_group in source:
+            self.append(trace_or_group)
+            events += 1
+        return events
+
+
+def write_hdf5(
+    filename: str | PathLike[str],
+    source: Run | str | PathLike[str] | Iterable[Trace | TraceGroup],
+    **kwargs,
+) -> int:
+    """
+    Writes all the events of `source` into a new HDF5 file and returns the number of events written.
+    Additional keyword arguments are forwarded to `HDF5Writer`
+    """
+    with HDF5Writer(filename, mode="w", **kwargs) as writer:
+        return writer.extend(source)
+
+
+def read_hdf5(
+    filename: str | PathLike[str],
+    events: int | slice | None = None,
+    channels: list[int] | None = None,
+    voltage: bool = True,
+    time: bool = False,
+) -> dict[str, numpy.ndarray]:
+    """
+    Reads events from an HDF5 file written with `HDF5Writer`. `events` selects a single event or a range of events,
+    only the corresponding rows are read from the file.
+    Returns a dict with the "event" number, "horiz_interval", "horiz_offset", "trigger_time" and "trigger_offset" of
+    each row (segment) and the 2D (rows x points) "CHx" arrays of the selected `channels` (all by default).
+    Raw ADC values are converted into voltage if `voltage` is True. If `time` is True the 2D "time" axis of each row
+    (index * horiz_interval + horiz_offset) is also returned.
+    """
+    with h5py.File(filename, "r") as f:
+        event_offsets = f["event_offsets"][()]
+        number_of_events = len(event_offsets) - 1
+        if events is None:
+            events = slice(None)
+        elif isinstance(events, int):
+            if events < 0:
+                events += number_of_events
+            if not 0 <= events < number_of_events:
+                raise IndexError(f"Event {events} out of range")
+            events = slice(events, events + 1)
+        start, stop, step = events.indices(number_of_events)
+        if step != 1:
+            raise ValueError("Only contiguous ranges of events are supported")
+        stop = max(start, stop)
+        rows = slice(event_offsets[start], event_offsets[stop])
+
+        data = {
+            "event": numpy.repeat(
+                numpy.arange(start, stop), numpy.diff(event_offsets[start : stop + 1])
+            ),
+            "horiz_interval": f["horiz_interval"][rows],
+            "horiz_offset": f["horiz_offset"][rows],
+            "trigger_time": f["trigger_time"][rows],
+            "trigger_offset": f["trigger_offset"][rows],
+        }
+        if time:
+            data["time"] = (
+                numpy.arange(f.attrs["points"])
+                * data["horiz_interval"][:, numpy.newaxis]
+                + data["horiz_offset"][:, numpy.newaxis]
+            )
+
+        names = sorted(
+            (name for name in f if name.startswith("CH")), key=lambda x: int(x[2:])
+        )
+        if channels is not None:
+            names = [f"CH{channel}" for channel in channels]
+        for name in names:
+            if name not in f:
+                raise KeyError(f"File does not contain channel {name[2:]}")
+            values = f[name]["values"][rows]
+            if voltage and f.attrs["adc_values"]:
+                values = (
+                    values * f[name]["vertical_gain"][rows][:, numpy.newaxis]
+                    - f[name]["vertical_offset"][rows][:, numpy.newaxis]
+                )
+            data[name] = values
+    return data
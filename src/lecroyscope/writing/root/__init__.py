@@ -1 +1 @@
-from .tree import get_tree_branch_definitions, get_tree_extend_data
+from .tree import get_tree_branch_definitions, get_tree_extend_data, write_tree
@@ -1,29 +1,73 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from os import PathLike
+from pathlib import Path
+from typing import Iterable
+
 import uproot
 import awkward
 import numpy
-from lecroyscope import Trace, TraceGroup
+from lecroyscope import Trace, TraceGroup, Run
+from lecroyscope.reading.trace_group import _get_trace_group, _segment_trigger_times
 
 
-def get_tree_branch_definitions(trace_or_group: Trace | TraceGroup, **kwargs) -> dict:
-    if isinstance(trace_or_group, TraceGroup):
-        trace_group = trace_or_group
-    elif isinstance(trace_or_group, Trace):
-        trace_group = TraceGroup(trace_or_group)
-    else:
+_time_axis_options = ("array", "scalar")
+
+
+def _check_time_axis(time_axis: str) -> None:
+    if time_axis not in _time_axis_options:
         raise ValueError(
-            "Input argument should be either 'lecroyscope.Trace' or 'lecroyscope.TraceGroup'"
+            f"Invalid time axis option: {time_axis}. Valid options are: {_time_axis_options}"
         )
+
+
+def get_tree_branch_definitions(
+    trace_or_group: Trace | TraceGroup,
+    time_axis: str = "array",
+    adc_values: bool = False,
+    **kwargs,
+) -> dict:
+    """
+    Returns a dict with the branch definitions which can be used as argument for the uproot mktree method.
+    If `time_axis` is "array" the time values are stored in a "time" branch for every entry. If it is "scalar" only
+    the "horiz_interval" and "horiz_offset" branches are stored (time = index * horiz_interval + horiz_offset) along
+    with the "trigger_time" and "trigger_offset" of each segment, which greatly reduces the size of the output.
+    If `adc_values` is True the raw (int8 or int16) ADC values are stored in the "CHx" branches instead of the
+    voltage, along with the "CHx_vertical_gain" and "CHx_vertical_offset" branches of each channel
+    (voltage = adc_value * vertical_gain - vertical_offset).
+    """
+    _check_time_axis(time_axis)
+    trace_group = _get_trace_group(trace_or_group)
     if trace_group.time is None:
         raise ValueError(
             "Trace Group does not have unified time information (probably do not come from the same trigger)"
         )
-    channels = {
-        f"CH{trace.channel}": ("f4", (len(trace_group.time),)) for trace in trace_group
-    }
+    channels = dict()
+    for trace in trace_group:
+        if adc_values:
+            channels[f"CH{trace.channel}"] = (
+                trace.adc_values.dtype.newbyteorder("="),
+                (len(trace_group.time),),
+            )
+            channels[f"CH{trace.channel}_vertical_gain"] = "f8"
+            channels[f"CH{trace.channel}_vertical_offset"] = "f8"
+        else:
+            channels[f"CH{trace.channel}"] = ("f4", (len(trace_group.time),))
+    if time_axis == "array":
+        time = {"time": ("f4", (len(trace_group.time),))}
+    else:
+        time = {
+            name: "f8"
+            for name in [
+                "horiz_interval",
+                "horiz_offset",
+                "trigger_time",
+                "trigger_offset",
+            ]
+        }
     branches = {
-        "time": ("f4", (len(trace_group.time),)),
+        **time,
         **channels,
         **kwargs,
     }
@@ -31,10 +75,16 @@ def get_tree_branch_definitions(trace_or_group: Trace | TraceGroup, **kwargs) ->
     return branches
 
 
-def get_tree_extend_data(trace_or_group: Trace | TraceGroup, **kwargs):
+def get_tree_extend_data(
+    trace_or_group: Trace | TraceGroup,
+    time_axis: str = "array",
+    adc_values: bool = False,
+    **kwargs,
+):
     """
     Returns a dict which can be used as argument for the uproot tree extend method.
     The resulting dict will have one "time" entry and one channel entry "CHx" per channel with corresponding data
+    (see `get_tree_branch_definitions` for the `time_axis` and `adc_values` options).
     Optionally kwargs can be used to set "additional" data which must be specified if it was also specified in the
     "get_tree_branch_definitions" method.
 
@@ -44,29 +94,126 @@ def get_tree_extend_data(trace_or_group: Trace | TraceGroup, **kwargs):
     The value will be the same for all sequences of the trace (if is sequence).
     If you want different data for each sequence, you can always extend the result of this method invoked without kwargs
     """
-    if isinstance(trace_or_group, TraceGroup):
-        trace_group = trace_or_group
-    elif isinstance(trace_or_group, Trace):
-        trace_group = TraceGroup(trace_or_group)
-    else:
-        raise ValueError(
-            "Input argument should be either 'lecroyscope.Trace' or 'lecroyscope.TraceGroup'"
-        )
+    _check_time_axis(time_axis)
+    trace_group = _get_trace_group(trace_or_group)
+    length = trace_group.trace_length
 
-    channels = {
-        f"CH{trace.channel}": trace.voltage.reshape((trace_group.trace_length, -1))
-        for trace in trace_group
-    }
+    channels = dict()
+    for trace in trace_group:
+        if adc_values:
+            channels[f"CH{trace.channel}"] = trace.adc_values.reshape((length, -1))
+            channels[f"CH{trace.channel}_vertical_gain"] = numpy.full(
+                length, trace.header["vertical_gain"]
+            )
+            channels[f"CH{trace.channel}_vertical_offset"] = numpy.full(
+                length, trace.header["vertical_offset"]
+            )
+        else:
+            channels[f"CH{trace.channel}"] = trace.voltage.reshape((length, -1))
 
-    kwargs = {
-        key: numpy.array(trace_group.trace_length * [value])
-        for key, value in kwargs.items()
-    }
+    kwargs = {key: numpy.array(length * [value]) for key, value in kwargs.items()}
+
+    if time_axis == "array":
+        time = {"time": numpy.tile(trace_group.time, (length, 1))}
+    else:
+        trace = next(trace_group)
+        trigger_time, trigger_offset = _segment_trigger_times(trace_group)
+        time = {
+            "horiz_interval": numpy.full(length, trace.sampling_interval),
+            "horiz_offset": numpy.full(length, trace.time_offset),
+            "trigger_time": trigger_time,
+            "trigger_offset": trigger_offset,
+        }
 
     return {
-        "time": numpy.array(trace_group.trace_length * [trace_group.time]).reshape(
-            (trace_group.trace_length, -1)
-        ),
+        **time,
         **channels,
         **kwargs,
     }
+
+
+def write_tree(
+    filename: str | PathLike[str],
+    source: Run | str | PathLike[str] | Iterable[Trace | TraceGroup],
+    tree_name: str = "t",
+    chunk_size: int = 1000,
+    time_axis: str = "array",
+    adc_values: bool = False,
+    **kwargs,
+) -> int:
+    """
+    Writes all the events of `source` into a new ROOT file with a single tree and returns the number of entries written.
+    `source` can be a `Run`, a directory / glob pattern (used to create a `Run`) or any iterable of traces or trace
+    groups. Branches are defined from the first event, see `get_tree_branch_definitions` (also for `time_axis` and
+    `adc_values`).
+
+    With `adc_values` every event must have the same ADC data type (int8 or int16) as the first one.
+
+    Entries are written in chunks of at least `chunk_size` entries (one basket per chunk), so memory usage is bounded
+    by the chunk size. Reading (prefetched by `Run`) and building the next chunk happens while the previous chunk is
+    compressed and written in a background thread.
+    Additional keyword arguments are forwarded to `uproot.recreate` (e.g. `compression`).
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be a positive integer")
+    _check_time_axis(time_axis)
+    if isinstance(source, (str, Path)):
+        source = Run(source)
+
+    entries = 0
+    with uproot.recreate(filename, **kwargs) as f, ThreadPoolExecutor(
+        max_workers=1
+    ) as executor:
+        tree = None
+        # data type of the ADC values of each channel, from the first event
+        adc_dtypes = dict()
+        pending = None
+        chunk = []
+        chunk_entries = 0
+
+        def flush():
+            nonlocal pending, chunk, chunk_entries
+            data = {
+                key: numpy.concatenate([event[key] for event in chunk])
+                for key in chunk[0]
+            }
+            if pending is not None:
+                # at most one chunk is being written while the next one is built
+                pending.result()
+            pending = executor.submit(tree.extend, data)
+            chunk = []
+            chunk_entries = 0
+
+        for trace_or_group in source:
+            if tree is None:
+                branches = get_tree_branch_definitions(
+                    trace_or_group, time_axis=time_axis, adc_values=adc_values
+                )
+                tree = f.mktree(tree_name, branches, "Tree")
+                if adc_values:
+                    adc_dtypes = {
+                        name: numpy.dtype(branch[0])
+                        for name, branch in branches.items()
+                        if isinstance(branch, tuple) and name != "time"
+                    }
+            data = get_tree_extend_data(
+                trace_or_group, time_axis=time_axis, adc_values=adc_values
+            )
+            for name, dtype in adc_dtypes.items():
+                if data[name].dtype.newbyteorder("=") != dtype:
+                    raise ValueError(
+                        f"Data type of {name} ({data[name].dtype}) does not match the first event ({dtype})"
+                    )
+            chunk.append(data)
+            number_of_entries = len(next(iter(data.values())))
+            chunk_entries += number_of_entries
+            entries += number_of_entries
+            if chunk_entries >= chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+        if pending is not None:
+            pending.result()
+
+    return entries
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
+from os import PathLike
+from typing import BinaryIO, Iterable
+
+import numpy
+
+from lecroyscope import Trace
+from lecroyscope.reading.header import Header, _pack_header, _trc_struct
+
+
+def write(
+    filename: str | PathLike[str] | BinaryIO,
+    header: Header | dict,
+    values: numpy.ndarray | Iterable[numpy.ndarray],
+    trigger_times: numpy.ndarray | None = None,
+    endianness: str | None = None,
+) -> None:
+    """
+    Writes a trc file from a header and the raw (int8 or int16) ADC values.
+
+    `values` can be a 1D array (single trace), a 2D array (sequence, one row per segment) or an iterable of 1D arrays,
+    one per segment. Segments are written to disk one at a time, so an iterable (e.g. a generator) can be used to
+    write sequences that do not fit in memory.
+    `trigger_times` is an array of shape (2, segments) with the trigger time and offset of each segment (as returned
+    by `read`). If not given, zeros are written for sequences.
+
+    The header fields describing the layout of the file (sizes, number of points and segments, sample width and byte
+    order) are computed from the data, the rest of the fields are written as they are.
+    `endianness` ('<' or '>') defaults to the byte order of the header ('comm_order').
+    `filename` can also be a seekable binary file object (e.g. `io.BytesIO`), which is written from its current
+    position and not closed.
+    """
+    header = dict(header._raw) if isinstance(header, Header) else dict(header)
+    if endianness is None:
+        endianness = ">" if header["comm_order"] == 0 else "<"
+    if endianness not in ("<", ">"):
+        raise ValueError(
+            f"Invalid endianness: {endianness}. Valid values are '<' and '>'"
+        )
+
+    if isinstance(values, numpy.ndarray):
+        sequence = values.ndim == 2
+        segments = values if sequence else [values]
+    else:
+        sequence = True
+        segments = values
+
+    number_of_segments = None
+    if not sequence:
+        # single traces have no trigger times array
+        trigger_times = numpy.zeros((2, 0), dtype=numpy.float64)
+    elif trigger_times is not None:
+        trigger_times = numpy.asarray(trigger_times, dtype=numpy.float64)
+        if trigger_times.ndim != 2 or trigger_times.shape[0] != 2:
+            raise ValueError("Trigger times must be an array of shape (2, segments)")
+        number_of_segments = trigger_times.shape[1]
+    else:
+        if not hasattr(segments, "__len__"):
+            raise ValueError(
+                "Trigger times are required when writing segments from an iterable without length"
+            )
+        number_of_segments = len(segments)
+        trigger_times = numpy.zeros((2, number_of_segments), dtype=numpy.float64)
+
+    header_size = _trc_struct[endianness].size
+    trigger_times_bytes = (
+        trigger_times.T.astype(numpy.dtype(numpy.float64).newbyteorder(endianness))
+        .reshape(-1)
+        .tobytes()
+    )
+    prefix_size = len(f"#9{0:09d}")
+
+    with open(filename, "wb") if not hasattr(filename, "write") else nullcontext(
+        filename
+    ) as f:
+        start = f.tell()
+        # the header is written once the number of points is known
+        f.seek(start + prefix_size + header_size)
+        f.write(trigger_times_bytes)
+
+        values_type = None
+        count = 0
+        written_segments = 0
+        samples_per_segment = None
+        for segment in segments:
+            segment = numpy.asarray(segment)
+            if segment.dtype.kind != "i" or segment.dtype.itemsize not in (1, 2):
+                raise ValueError(
+                    f"Invalid values type: {segment.dtype}. Values must be raw ADC values (int8 or int16)"
+                )
+            if values_type is None:
+                values_type = segment.dtype.newbyteorder(endianness)
+                samples_per_segment = segment.size
+            elif segment.dtype.itemsize != values_type.itemsize:
+                raise ValueError("All segments must have the same values type")
+            elif segment.size != samples_per_segment:
+                raise ValueError("All segments must have the same number of points")
+            f.write(segment.astype(values_type, copy=False).tobytes())
+            count += segment.size
+            written_segments += 1
+
+        if values_type is None:
+            raise ValueError("Cannot write a trace without values")
+        if number_of_segments is not None and written_segments != number_of_segments:
+            raise ValueError(
+                f"Number of segments ({written_segments}) does not match the trigger times ({number_of_segments})"
+            )
+
+        header.update(
+            comm_type=0 if values_type.itemsize == 1 else 1,
+            wave_descriptor=header_size,
+            user_text=0,
+            trig_time_array=len(trigger_times_bytes),
+            ris_time_array=0,
+            res_array1=0,
+            wave_array1=count * values_type.itemsize,
+            wave_array2=0,
+            res_array2=0,
+            res_array3=0,
+            wave_array_count=count,
+            first_valid_point=0,
+            last_valid_point=count - 1,
+            subarray_count=written_segments if sequence else 1,
+        )
+        end = f.tell()
+        size = end - start - prefix_size
+        f.seek(start)
+        f.write(f"#9{size:09d}".encode("ascii"))
+        f.write(_pack_header(header, endianness))
+        f.seek(end)
+
+
+def write_trace(
+    filename: str | PathLike[str], trace: Trace, endianness: str | None = None
+) -> None:
+    """
+    Writes a `Trace` (or the selected segments of a sequence trace) to a trc file
+    """
+    write(
+        filename,
+        trace.header,
+        trace.adc_values,
+        trigger_times=trace.trigger_times if trace.sequence else None,
+        endianness=endianness,
+    )
@@ -0,0 +1,52 @@
+import pytest
+
+from pathlib import Path
+import numpy as np
+
+import lecroyscope
+
+files_path = Path(__file__).parent / "files"
+
+
+def test_read_headers():
+    filenames = [
+        files_path / "header.trc",
+        files_path / "pulse.trc",
+        files_path / "pulse_sequence.trc",
+        files_path / "issue_1.trc",
+    ]
+    catalog = lecroyscope.reading.read_headers(*filenames)
+
+    for i, filename in enumerate(filenames):
+        header = lecroyscope.Trace(filename, header_only=True).header
+        assert catalog["filename"][i] == str(filename)
+        for name, value in header:
+            if name == "trigger_time":
+                assert catalog[name][i] == np.datetime64(value)
+            elif isinstance(value, float):
+                assert catalog[name][i] == pytest.approx(value)
+            else:
+                assert catalog[name][i] == value
+
+    assert np.all(catalog["channel"] == -1)
+
+    # glob
+    catalog_glob = lecroyscope.reading.read_headers(files_path / "*.trc")
+    assert len(catalog_glob["filename"]) == len(filenames)
+
+
+def test_read_headers_channel_trace(tmp_path):
+    for channel in [1, 2]:
+        for trace_number in [1, 2, 3]:
+            tmp_file = tmp_path / f"C{channel}Trace{trace_number:05d}.trc"
+            tmp_file.write_bytes((files_path / "pulse.trc").read_bytes())
+
+    catalog = lecroyscope.reading.read_headers(tmp_path / "C*Trace*.trc")
+    assert len(catalog["filename"]) == 6
+    assert sorted(catalog["channel"]) == [1, 1, 1, 2, 2, 2]
+    assert sorted(catalog["trace_number"]) == [1, 1, 2, 2, 3, 3]
+
+    with pytest.raises(ValueError):
+        invalid_file = tmp_path / "invalid.trc"
+        invalid_file.write_bytes(b"not a trace file")
+        lecroyscope.reading.read_headers(invalid_file)
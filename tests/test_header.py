@@ -92,3 +92,18 @@ Vertical offset: -0.949999988079071
 Wave array count: 400400
 Subarray count: 200"""
     )
+
+
+def test_header_from_raw_values():
+    from pathlib import Path
+
+    data = (Path(__file__).parent / "files" / "header.trc").read_bytes()
+    raw_header = lecroyscope.reading.header._parse_header(data, data.find(b"WAVEDESC"))
+    # values are stored as in the file
+    assert raw_header["record_type"] == 0
+    assert isinstance(raw_header["instrument_name"], bytes)
+
+    # and decoded on access
+    header = lecroyscope.reading.Header(raw_header)
+    assert header.record_type == "single sweep"
+    assert dict(header) == header_reference_dict
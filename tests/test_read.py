@@ -53,6 +53,30 @@ def test_read_header_from_bytes():
     assert header_from_file == header_from_bytes
 
 
+def test_read_from_buffer():
+    filename = files_path / "pulse_sequence.trc"
+    header, trigger_times, values = lecroyscope.reading.read(filename)
+
+    data = bytearray(b"C1:WF ALL,") + filename.read_bytes()
+    for buffer in [bytes(data), data, memoryview(data)]:
+        (
+            header_from_buffer,
+            trigger_times_from_buffer,
+            values_from_buffer,
+        ) = lecroyscope.reading.read(buffer)
+        assert header_from_buffer == header
+        assert_array_equal(trigger_times_from_buffer, trigger_times)
+        assert_array_equal(values_from_buffer, values)
+        # arrays are views into the buffer
+        assert np.shares_memory(values_from_buffer, np.frombuffer(buffer, np.uint8))
+
+    trace = lecroyscope.Trace(memoryview(data))
+    assert trace.channel == 1
+
+    with pytest.raises(ValueError):
+        lecroyscope.reading.read(bytes(100))
+
+
 def test_read_data_from_file():
     for filename, shape in zip(
         [
@@ -68,3 +92,57 @@ def test_read_data_from_file():
             values_from_file,
         ) = lecroyscope.reading.read(filename, header_only=False)
         assert values_from_file.shape == shape
+
+
+def test_read_memory_map():
+    for filename in [
+        files_path / "pulse.trc",
+        files_path / "pulse_sequence.trc",
+        files_path / "issue_1.trc",
+    ]:
+        header, trigger_times, values = lecroyscope.reading.read(filename)
+        (
+            header_mmap,
+            trigger_times_mmap,
+            values_mmap,
+        ) = lecroyscope.reading.read(filename, memory_map=True)
+
+        assert header == header_mmap
+        assert_array_equal(trigger_times, trigger_times_mmap)
+        assert_array_equal(values, values_mmap)
+        assert values_mmap.dtype == values.dtype
+        # views into the mapped file are read-only
+        assert not values_mmap.flags.writeable
+
+    with pytest.raises(ValueError):
+        lecroyscope.reading.read(
+            (files_path / "pulse.trc").read_bytes(), memory_map=True
+        )
+
+
+def test_read_segments():
+    filename = files_path / "pulse_sequence.trc"
+    _, trigger_times, values = lecroyscope.reading.read(filename)
+
+    for segments in [slice(5, 10), slice(2, 18, 3), slice(None, None, -1), slice(3, 3)]:
+        for memory_map in [False, True]:
+            (
+                _,
+                trigger_times_selected,
+                values_selected,
+            ) = lecroyscope.reading.read(
+                filename, memory_map=memory_map, segments=segments
+            )
+            assert_array_equal(trigger_times[:, segments], trigger_times_selected)
+            assert_array_equal(values[segments], values_selected)
+
+        # also from bytes
+        _, trigger_times_selected, values_selected = lecroyscope.reading.read(
+            filename.read_bytes(), segments=segments
+        )
+        assert_array_equal(trigger_times[:, segments], trigger_times_selected)
+        assert_array_equal(values[segments], values_selected)
+
+    with pytest.raises(ValueError):
+        # not a sequence
+        lecroyscope.reading.read(files_path / "pulse.trc", segments=slice(0, 1))
@@ -0,0 +1,52 @@
+import pytest
+
+from pathlib import Path
+import numpy as np
+
+import lecroyscope
+
+files_path = Path(__file__).parent / "files"
+
+
+def make_run(path, channels, trace_numbers):
+    for channel in channels:
+        for trace_number in trace_numbers:
+            tmp_file = path / f"C{channel}Trace{trace_number:05d}.trc"
+            tmp_file.write_bytes((files_path / "pulse.trc").read_bytes())
+
+
+def test_run(tmp_path):
+    channels = [1, 2, 4]
+    trace_numbers = list(range(10))
+    make_run(tmp_path, channels, trace_numbers)
+    # incomplete event
+    make_run(tmp_path, [1], [10])
+
+    for prefetch in [0, 1, 3]:
+        run = lecroyscope.Run(tmp_path, prefetch=prefetch)
+        assert len(run) == 11
+        assert run.trace_numbers == trace_numbers + [10]
+        assert run.channels == channels
+
+        events = list(run)
+        assert len(events) == len(run)
+        for trace_group in events[:-1]:
+            assert isinstance(trace_group, lecroyscope.TraceGroup)
+            assert trace_group.channels == channels
+        assert events[-1].channels == [1]
+
+    # only complete events
+    run = lecroyscope.Run(tmp_path, channels=[1, 2])
+    assert run.trace_numbers == trace_numbers
+    assert run[0].channels == [1, 2]
+    assert 10 not in run
+    with pytest.raises(KeyError):
+        run[10]
+
+    # glob pattern
+    run = lecroyscope.Run(tmp_path / "C*Trace0000[0-4].trc", dtype=np.float32)
+    assert run.trace_numbers == [0, 1, 2, 3, 4]
+    assert run[0][1].voltage.dtype == np.float32
+
+    with pytest.raises(ValueError):
+        lecroyscope.Run(tmp_path, prefetch=-1)
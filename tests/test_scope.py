@@ -0,0 +1,430 @@
+import pytest
+
+from pathlib import Path
+import re
+import time
+from numpy.testing import assert_array_equal
+import numpy as np
+
+import lecroyscope
+
+files_path = Path(__file__).parent / "files"
+
+
+class FakeInstrument:
+    """
+    Minimal stand-in for 'vxi11.Instrument' answering waveform queries with a trace file
+    """
+
+    def __init__(self, filename=files_path / "pulse_sequence.trc"):
+        self.timeout = 10.0
+        self.data = Path(filename).read_bytes()
+        self.commands = []
+
+    def write(self, command):
+        self.commands.append(command)
+
+    def read_raw(self):
+        channel = re.match(r"C(\d+):WF\?", self.commands[-1]).group(1)
+        return f"C{channel}:WF ALL,".encode("ascii") + self.data
+
+    def ask(self, command):
+        self.commands.append(command)
+        return "VBS 1"
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def scope():
+    scope = lecroyscope.Scope("127.0.0.1")
+    scope._instrument = FakeInstrument()
+    return scope
+
+
+def test_scope_read(scope):
+    trace_reference = lecroyscope.Trace(files_path / "pulse_sequence.trc")
+
+    trace = scope.read(2)
+    assert trace.channel == 2
+    assert_array_equal(trace.voltage, trace_reference.voltage)
+
+    trace_group = scope.read(1, 3, 4)
+    assert trace_group.channels == [1, 3, 4]
+    for trace in trace_group:
+        assert_array_equal(trace.voltage, trace_reference.voltage)
+    assert scope.instrument.commands[-3:] == ["C1:WF?", "C3:WF?", "C4:WF?"]
+
+    trace_group = scope.read(1, 2, header_only=True)
+    for trace in trace_group:
+        assert trace.header_only
+        assert dict(trace.header) == dict(trace_reference.header)
+
+    data = scope.read_raw(1, 2)
+    assert [lecroyscope.Trace(d).channel for d in data] == [1, 2]
+
+    with pytest.raises(ValueError):
+        scope.read()
+
+
+def test_scope_acquisition(scope):
+    from lecroyscope.control import Acquisition
+
+    with Acquisition(scope, 1, 2, max_events=10) as acquisition:
+        events = list(acquisition)
+    assert [event.number for event in events] == list(range(10))
+    for event in events:
+        trace_group = lecroyscope.TraceGroup(*event.data)
+        assert trace_group.channels == [1, 2]
+    statistics = acquisition.statistics()
+    assert statistics["triggers"] == 10
+    assert statistics["dropped"] == 0
+    assert statistics["trigger_rate"] > 0
+
+    # without consumers, events that do not fit in the queue are dropped
+    acquisition = Acquisition(scope, 1, queue_size=2, block=False, max_events=5)
+    acquisition.start()
+    acquisition.join()
+    assert not acquisition.running
+    assert acquisition.triggers == 5
+    assert acquisition.dropped == 3
+    assert len(list(acquisition)) == 2
+
+    # with back-pressure, the event waiting for the consumers when stopping is dropped
+    acquisition = Acquisition(scope, 1, queue_size=1, max_events=2)
+    acquisition.start()
+    while acquisition.triggers < 2:
+        time.sleep(0.001)
+    acquisition.stop()
+    assert acquisition.dropped == 1
+    assert len(list(acquisition)) == 1
+
+    with pytest.raises(ValueError):
+        Acquisition(scope)
+
+
+def test_async_scope():
+    import asyncio
+    from lecroyscope.control import AsyncScope
+
+    scopes = []
+    for _ in range(3):
+        scope = lecroyscope.Scope("127.0.0.1")
+        scope._instrument = FakeInstrument()
+        scopes.append(AsyncScope(scope))
+
+    async def acquire_and_read(async_scope):
+        async with async_scope:
+            assert await async_scope.acquire()
+            assert await async_scope.get("Acquisition.TriggerMode") == "1"
+            return await async_scope.read(1, 2)
+
+    async def main():
+        return await asyncio.gather(*(acquire_and_read(s) for s in scopes))
+
+    for trace_group, async_scope in zip(asyncio.run(main()), scopes):
+        assert trace_group.channels == [1, 2]
+        assert async_scope.scope.instrument.commands[-2:] == ["C1:WF?", "C2:WF?"]
+
+    # closing waits for the pending calls without blocking the event loop
+    from lecroyscope.control import SimulatedInstrument
+
+    slow_scope = lecroyscope.Scope(instrument=SimulatedInstrument(latency=0.2))
+
+    async def ticker(ticks):
+        while True:
+            await asyncio.sleep(0.01)
+            ticks.append(None)
+
+    async def close_pending():
+        ticks = []
+        task = asyncio.ensure_future(ticker(ticks))
+        async with AsyncScope(slow_scope) as async_scope:
+            pending = asyncio.ensure_future(async_scope.get("Acquisition.TriggerMode"))
+            await asyncio.sleep(0)
+        task.cancel()
+        assert await pending == "Stopped"
+        return len(ticks)
+
+    assert asyncio.run(close_pending()) > 5
+
+
+def test_scope_batch(scope):
+    scope.instrument.ask = lambda command: (
+        scope.instrument.commands.append(command) or "VBS 0.5\x01DC50"
+    )
+    with scope.batch() as batch:
+        batch.set("Acquisition.C1.VerScale", 0.5).set("Acquisition.C1.Coupling", "DC50")
+        batch.get("Acquisition.C1.VerScale").get("Acquisition.C1.Coupling")
+    assert batch.values == {
+        "Acquisition.C1.VerScale": "0.5",
+        "Acquisition.C1.Coupling": "DC50",
+    }
+    assert len(scope.instrument.commands) == 1
+    assert scope.instrument.commands[0] == (
+        'VBS? \'app.Acquisition.C1.VerScale = "0.5"\n'
+        'app.Acquisition.C1.Coupling = "DC50"\n'
+        "return = CStr(app.Acquisition.C1.VerScale) & Chr(1) & CStr(app.Acquisition.C1.Coupling)'"
+    )
+
+    batch = scope.batch().get("Acquisition.C1.VerScale")
+    with pytest.raises(ValueError):
+        batch.execute()
+
+
+def test_scope_batch_separator():
+    from lecroyscope.control import SimulatedInstrument
+
+    instrument = SimulatedInstrument(channels=1)
+    instrument.settings["Acquisition.C1.Name"] = "signal | reference"
+    scope = lecroyscope.Scope(instrument=instrument)
+    values = scope.snapshot(["Acquisition.C1.Name", "Acquisition.C1.Coupling"])
+    assert values == {
+        "Acquisition.C1.Name": "signal | reference",
+        "Acquisition.C1.Coupling": "DC50",
+    }
+
+
+def test_simulated_scope():
+    from lecroyscope.control import SimulatedInstrument
+
+    scope = lecroyscope.Scope(
+        instrument=SimulatedInstrument(samples=1000, segments=10, channels=2)
+    )
+    assert scope.id.startswith("*IDN LECROY")
+    assert scope.name_all[:2] == ["C1", "C2"]
+    assert scope.num_segments == 10
+    scope.trigger_mode = "Normal"
+    assert scope.trigger_mode == "Normal"
+
+    channel = scope.channel(2)
+    channel.vertical_scale = 0.5
+    assert channel.vertical_scale == 0.5
+    assert channel.settings()["VerScale"] == "0.5"
+    with pytest.raises(ValueError):
+        scope.channel(3)
+
+    assert scope.acquire()
+    trace_group = scope.read(1, 2)
+    assert trace_group.channels == [1, 2]
+    assert trace_group.trace_length == 10
+    assert trace_group[1].voltage.shape == (10, 1000)
+
+    with pytest.raises(ValueError):
+        lecroyscope.Scope()
+
+
+def test_scope_settings_cache():
+    from lecroyscope.control import SimulatedInstrument
+
+    instrument = SimulatedInstrument(samples=100, channels=2)
+    commands = []
+    ask = instrument.ask
+    instrument.ask = lambda command: commands.append(command) or ask(command)
+    scope = lecroyscope.Scope(instrument=instrument, cache=True)
+    channel = scope.channel(1)
+    commands.clear()
+
+    assert channel.vertical_scale == 0.1
+    assert channel.vertical_scale == 0.1
+    assert len(commands) == 1
+    channel.vertical_scale = 0.1
+    assert len(commands) == 1
+    channel.vertical_scale = 0.2
+    assert channel.vertical_scale == 0.2
+    assert len(commands) == 2
+
+    # changes not made through the scope object are only seen after invalidation
+    instrument.settings["Acquisition.C1.VerScale"] = "0.5"
+    assert channel.vertical_scale == 0.2
+    scope.invalidate("Acquisition.C1.VerScale")
+    assert channel.vertical_scale == 0.5
+    instrument.settings["Acquisition.C1.VerScale"] = "0.3"
+    commands.clear()
+    assert scope.refresh()["Acquisition.C1.VerScale"] == "0.3"
+    assert channel.vertical_scale == 0.3
+    assert len(commands) == 1
+
+    commands.clear()
+    snapshot = scope.snapshot()
+    assert len(commands) == 1
+    assert snapshot["Acquisition.C2.Coupling"] == "DC50"
+    scope.trigger_mode = "Normal"
+    channel.vertical_offset = 0.1
+    scope.restore(snapshot)
+    assert instrument.settings["Acquisition.TriggerMode"] == "Stopped"
+    assert instrument.settings["Acquisition.C1.VerOffset"] == "0"
+    assert channel.vertical_offset == 0
+
+    # parameters other than settings are always queried
+    instrument.settings["Measure.P1.Out.Result.Value"] = "1.5"
+    assert scope.get("Measure.P1.Out.Result.Value") == "1.5"
+    instrument.settings["Measure.P1.Out.Result.Value"] = "2.5"
+    assert scope.get("Measure.P1.Out.Result.Value") == "2.5"
+    assert scope.snapshot(["Measure.P1.Out.Result.Value"]) == {
+        "Measure.P1.Out.Result.Value": "2.5"
+    }
+    assert "Measure.P1.Out.Result.Value" not in scope._cache
+
+    scope.cache = False
+    commands.clear()
+    assert scope.num_segments == 1
+    assert scope.num_segments == 1
+    assert len(commands) == 2
+
+
+class FakeClient:
+    """
+    Stand-in for the RPC client of 'vxi11.Instrument' returning the response in chunks
+    """
+
+    def __init__(self, data, chunk_size=1000):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    def device_read(self, link, read_len, timeout, lock_timeout, flags, term_char):
+        from vxi11.vxi11 import RX_END
+
+        chunk = self.data[self.offset : self.offset + self.chunk_size]
+        self.offset += len(chunk)
+        reason = RX_END if self.offset >= len(self.data) else 0
+        return 0, reason, chunk
+
+
+def test_scope_read_into_buffer():
+    import vxi11
+
+    trace_reference = lecroyscope.Trace(files_path / "pulse_sequence.trc")
+    data = b"C1:WF ALL," + (files_path / "pulse_sequence.trc").read_bytes() + b"\n"
+
+    instrument = vxi11.Instrument("127.0.0.1")
+    instrument.link = 1
+    instrument.write = lambda command: setattr(instrument, "client", FakeClient(data))
+    scope = lecroyscope.Scope(instrument=instrument)
+    instrument.close = lambda: None
+
+    (raw,) = scope.read_raw(1)
+    assert raw == data
+
+    trace = scope.read(1, reuse_buffers=True)
+    assert_array_equal(trace.voltage, trace_reference.voltage)
+    buffer = scope._buffers[1]
+    assert len(buffer) == len(data)
+    trace = scope.read(1, reuse_buffers=True)
+    assert scope._buffers[1] is buffer
+    assert_array_equal(trace.adc_values, trace_reference.adc_values)
+
+
+def test_scope_read_raw_passthrough():
+    import vxi11
+
+    data = b"C1:WF ALL," + (files_path / "pulse.trc").read_bytes() + b"\n"
+
+    class RawInstrument(FakeInstrument):
+        def read_raw(self):
+            return data
+
+    scope = lecroyscope.Scope(instrument=RawInstrument())
+    (raw,) = scope.read_raw(1)
+    assert raw is data
+
+    # instruments missing the attributes used to read in chunks fall back to 'read_raw'
+    instrument = vxi11.Instrument("127.0.0.1")
+    del instrument.max_recv_size
+    instrument.write = lambda command: None
+    instrument.read_raw = lambda: data
+    instrument.close = lambda: None
+    scope = lecroyscope.Scope(instrument=instrument)
+    assert scope.read_raw(1)[0] is data
+    trace = scope.read(1, reuse_buffers=True)
+    assert_array_equal(
+        trace.voltage, lecroyscope.Trace(files_path / "pulse.trc").voltage
+    )
+
+
+def test_scope_transfer_options():
+    from lecroyscope.control import SimulatedInstrument
+
+    scope = lecroyscope.Scope(
+        instrument=SimulatedInstrument(samples=1000, segments=10, channels=2)
+    )
+    reference = scope.read(1)
+    assert reference.adc_values.dtype.itemsize == 2
+    assert reference.voltage.shape == (10, 1000)
+
+    scope.transfer_format = "byte"
+    assert scope.transfer_format == "BYTE"
+    trace = scope.read(1)
+    assert trace.adc_values.dtype.itemsize == 1
+    assert np.allclose(trace.voltage, reference.voltage, atol=256 * 1e-4)
+    with pytest.raises(ValueError):
+        scope.transfer_format = "float"
+    scope.transfer_format = "WORD"
+
+    trace = scope.channel(1).read(segment=3, first_point=100, number_of_points=50)
+    assert not trace.sequence
+    assert_array_equal(trace.voltage, reference.voltage[2, 100:150])
+    assert_array_equal(trace.time, reference.time[100:150])
+
+    trace_group = scope.read(1, 2, sparsing=10)
+    assert trace_group.time is not None
+    assert_array_equal(trace_group[1].voltage, reference.voltage[:, ::10])
+    assert_array_equal(trace_group[1].time, reference.time[::10])
+
+    # the setup applies until changed
+    assert scope.read(1).voltage.shape == (10, 100)
+    assert scope.read(1, sparsing=0).voltage.shape == (10, 1000)
+
+    with pytest.raises(ValueError):
+        scope.waveform_setup(segment=-1)
+
+
+def test_multi_scope():
+    from lecroyscope.control import MultiScope, SimulatedInstrument
+
+    scopes = {
+        name: lecroyscope.Scope(
+            instrument=SimulatedInstrument(samples=100, segments=5, latency=1e-3)
+        )
+        for name in ["a", "b", "c"]
+    }
+    with MultiScope(scopes, channels={"a": [1, 2], "b": [3], "c": [1]}) as multi:
+        event = multi.acquire()
+        assert list(event) == ["a", "b", "c"]
+        assert event["a"].channels == [1, 2]
+        assert event["b"].channel == 3
+        assert set(event.time_offsets.values()) == {0.0}
+        assert event.trigger_times["c"].shape == (5,)
+        assert event.trigger_times["c"][0] == event.trigger_time
+        for latency in event.latency.values():
+            assert latency["total"] >= latency["read"] > 0
+
+        events = multi.record(3)
+        assert len(events) == 3
+        assert sorted(events) == list(events)
+        assert event.trigger_time not in events
+
+    with pytest.raises(ValueError):
+        MultiScope(scopes, channels={"a": [1]})
+
+    # a scope that never triggers
+    scopes["c"] = lecroyscope.Scope(instrument=SimulatedInstrument(trigger_rate=1))
+    scopes["c"].timeout = 0.01
+    with MultiScope(scopes, channels=[1]) as multi:
+        with pytest.raises(RuntimeError):
+            multi.record(1, max_misses=3)
+        assert multi.timeouts == {"a": 0, "b": 0, "c": 3}
+
+    # scopes whose trigger times drift apart
+    scopes["c"] = lecroyscope.Scope(instrument=SimulatedInstrument(trigger_rate=100))
+    scopes = {name: scopes[name] for name in ["b", "c"]}
+    scopes["b"].instrument.triggers = 0
+    with MultiScope(scopes, channels=[1], tolerance=1e-3) as multi:
+        assert multi.acquire() is not None
+        assert multi.acquire() is None
+        assert multi.mismatches == 1
+
+    with pytest.raises(ValueError):
+        MultiScope(scopes, channels=[1], tolerance=-1)
@@ -1,6 +1,6 @@
 import pytest
 
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_equal, assert_array_almost_equal
 import numpy as np
 from pathlib import Path
 
@@ -131,3 +131,115 @@ def test_trace_adc_values():
     ) = lecroyscope.reading.read(filename)
 
     assert_array_equal(adc_from_file, adc_from_trace)
+    assert adc_from_trace.dtype in (np.int8, np.int16)
+    assert not adc_from_trace.flags.writeable
+
+    # raw values are not recomputed
+    assert trace.adc_values is adc_from_trace
+    assert_array_almost_equal(
+        adc_from_trace * trace.header["vertical_gain"]
+        - trace.header["vertical_offset"],
+        trace.voltage,
+    )
+
+
+def test_trace_memory_map():
+    filename = files_path / "pulse_sequence.trc"
+    trace = lecroyscope.Trace(filename)
+
+    with lecroyscope.Trace(filename, memory_map=True) as trace_mmap:
+        assert trace_mmap.memory_mapped
+        assert_array_equal(trace.voltage, trace_mmap.voltage)
+        assert_array_equal(trace.trigger_times, trace_mmap.trigger_times)
+
+    assert not trace_mmap.memory_mapped
+    assert not trace.memory_mapped
+    # derived arrays are still available after closing
+    assert_array_equal(trace.voltage, trace_mmap.voltage)
+
+
+def test_trace_memory_map_closed_on_error(tmp_path, monkeypatch):
+    import mmap
+
+    mappings = []
+    mmap_class = mmap.mmap
+
+    def mmap_spy(*args, **kwargs):
+        mappings.append(mmap_class(*args, **kwargs))
+        return mappings[-1]
+
+    monkeypatch.setattr(mmap, "mmap", mmap_spy)
+    truncated = tmp_path / "truncated.trc"
+    truncated.write_bytes((files_path / "pulse_sequence.trc").read_bytes()[:-1000])
+    with pytest.raises(ValueError):
+        lecroyscope.reading.read(truncated, memory_map=True)
+    with pytest.raises(ValueError):
+        lecroyscope.reading.read(
+            files_path / "pulse.trc", memory_map=True, segments=slice(1)
+        )
+    assert len(mappings) == 2
+    assert all(mapping.closed for mapping in mappings)
+
+
+def test_trace_lazy_arrays():
+    filename = files_path / "pulse.trc"
+    trace = lecroyscope.Trace(filename)
+
+    # arrays are computed on first access and cached
+    assert trace._voltage is None and trace._time is None
+    assert trace.voltage is trace.voltage
+    assert trace.time is trace.time
+
+    with lecroyscope.Trace(filename, memory_map=True) as trace_mmap:
+        assert len(trace_mmap) == 1
+
+    # time only depends on the header
+    assert_array_equal(trace.time, trace_mmap.time)
+    with pytest.raises(ValueError):
+        trace_mmap.voltage
+
+
+def test_trace_dtype():
+    filename = files_path / "pulse_sequence.trc"
+    trace = lecroyscope.Trace(filename)
+    trace_float32 = lecroyscope.Trace(filename, dtype=np.float32)
+
+    assert trace.dtype == np.float64
+    assert trace_float32.voltage.dtype == trace_float32.time.dtype == np.float32
+    assert_array_almost_equal(trace.voltage, trace_float32.voltage, decimal=5)
+    assert_array_almost_equal(trace.time, trace_float32.time)
+
+    with pytest.raises(ValueError):
+        lecroyscope.Trace(filename, dtype=np.int16)
+
+
+def test_trace_segments(tmp_path):
+    filename = files_path / "pulse_sequence.trc"
+    trace = lecroyscope.Trace(filename)
+    trace_segments = lecroyscope.Trace(filename, segments=slice(10, 15))
+
+    assert len(trace_segments) == 5
+    assert trace_segments.sequence
+    assert_array_equal(trace.voltage[10:15], trace_segments.voltage)
+    assert_array_equal(trace.trigger_times[:, 10:15], trace_segments.trigger_times)
+    assert_array_equal(trace.time, trace_segments.time)
+
+    for memory_map in [False, True]:
+        trace_segment = lecroyscope.Trace(
+            filename, segments=slice(3, 4), memory_map=memory_map
+        )
+        assert len(trace_segment) == 1
+        ((time, voltage),) = list(trace_segment)
+        assert voltage.ndim == 1
+        assert_array_equal(voltage, trace.voltage[3])
+
+        with pytest.raises(ValueError):
+            lecroyscope.Trace(filename, segments=3, memory_map=memory_map)
+
+    # segments missing from a truncated file are not silently returned
+    truncated = tmp_path / "truncated.trc"
+    truncated.write_bytes(filename.read_bytes()[:-1000])
+    for segments in [slice(15, 20), slice(15, 20, 2)]:
+        with pytest.raises(ValueError):
+            lecroyscope.reading.read(truncated, segments=segments)
+    lecroyscope.reading.read(truncated, segments=slice(0, 5))
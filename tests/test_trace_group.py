@@ -31,3 +31,54 @@ def test_trace_group_from_files(tmp_path):
 
         for channel in channels:
             assert channel == trace_group[channel].channel
+
+
+def test_trace_group_dtype(tmp_path):
+    for channel in [1, 2]:
+        tmp_file = tmp_path / f"C{channel}Trace00001.trc"
+        tmp_file.write_bytes((files_path / "pulse.trc").read_bytes())
+
+    trace_group = lecroyscope.TraceGroup(
+        tmp_path / "C*Trace00001.trc", dtype=np.float32
+    )
+    for trace in trace_group:
+        assert trace.voltage.dtype == np.float32
+    assert trace_group.time.dtype == np.float32
+
+
+def test_trace_group_parallel(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    channels = [1, 2, 3, 4]
+    for channel in channels:
+        tmp_file = tmp_path / f"C{channel}Trace00001.trc"
+        tmp_file.write_bytes((files_path / "pulse_sequence.trc").read_bytes())
+
+    trace_group = lecroyscope.TraceGroup(tmp_path / "C*Trace00001.trc")
+    trace_group_threads = lecroyscope.TraceGroup(
+        tmp_path / "C*Trace00001.trc", workers=4
+    )
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        trace_group_processes = lecroyscope.TraceGroup(
+            tmp_path / "C*Trace00001.trc", executor=executor
+        )
+
+    for group in [trace_group_threads, trace_group_processes]:
+        assert group.channels == channels
+        for channel in channels:
+            np.testing.assert_array_equal(
+                group[channel].voltage, trace_group[channel].voltage
+            )
+
+    # duplicate channels are still detected
+    with pytest.raises(ValueError):
+        lecroyscope.TraceGroup(
+            tmp_path / "C1Trace00001.trc", tmp_path / "C1Trace00001.trc", workers=2
+        )
+
+
+def test_load_traces():
+    filenames = [files_path / "pulse.trc", files_path / "pulse_sequence.trc"] * 3
+    traces = lecroyscope.reading.load_traces(filenames, workers=3, channel=1)
+    assert [len(trace) for trace in traces] == [1, 20] * 3
+    assert all(trace.channel == 1 for trace in traces)
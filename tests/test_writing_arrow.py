@@ -0,0 +1,59 @@
+import pytest
+from pathlib import Path
+import lecroyscope
+from numpy.testing import assert_array_equal
+import numpy as np
+
+pyarrow = pytest.importorskip("pyarrow")
+
+files_path = Path(__file__).parent / "files"
+
+
+def test_record_batch():
+    for filename in [files_path / "pulse.trc", files_path / "pulse_sequence.trc"]:
+        trace_group = lecroyscope.TraceGroup(
+            *[lecroyscope.Trace(filename, channel=channel) for channel in [1, 2]]
+        )
+        batch = lecroyscope.writing.arrow.record_batch(trace_group)
+        assert batch.num_rows == trace_group.trace_length
+        for trace in trace_group:
+            column = batch.column(f"CH{trace.channel}")
+            assert column.type.list_size == len(trace_group.time)
+            assert_array_equal(column.flatten().to_numpy(), trace.voltage.reshape(-1))
+
+        batch = lecroyscope.writing.arrow.record_batch(trace_group, adc_values=True)
+        assert batch.column("CH1").type.value_type == pyarrow.int16()
+
+
+def test_parquet(tmp_path):
+    channels = [1, 2]
+    number_of_events = 3
+    for channel in channels:
+        for trace_number in range(number_of_events):
+            tmp_file = tmp_path / f"C{channel}Trace{trace_number:05d}.trc"
+            tmp_file.write_bytes((files_path / "pulse_sequence.trc").read_bytes())
+
+    trace = lecroyscope.Trace(files_path / "pulse_sequence.trc")
+    for adc_values in [False, True]:
+        parquet_file = tmp_path / "run.parquet"
+        rows = lecroyscope.writing.arrow.write_parquet(
+            parquet_file, tmp_path, adc_values=adc_values
+        )
+        assert rows == number_of_events * len(trace)
+
+        data = lecroyscope.writing.arrow.read_parquet(parquet_file)
+        assert_array_equal(data["event"], np.repeat(np.arange(number_of_events), 20))
+        assert_array_equal(data["segment"], np.tile(np.arange(20), number_of_events))
+        for channel in channels:
+            assert_array_equal(
+                data[f"CH{channel}"], np.concatenate(number_of_events * [trace.voltage])
+            )
+        time = (
+            np.arange(len(trace.time)) * data["horiz_interval"][0]
+            + data["horiz_offset"][0]
+        )
+        assert_array_equal(time, trace.time)
+
+    # raw values
+    data = lecroyscope.writing.arrow.read_parquet(parquet_file, voltage=False)
+    assert data["CH1"].dtype == np.int16
@@ -0,0 +1,123 @@
+import pytest
+from pathlib import Path
+import lecroyscope
+from numpy.testing import assert_array_equal
+import numpy as np
+
+h5py = pytest.importorskip("h5py")
+
+files_path = Path(__file__).parent / "files"
+
+
+def test_hdf5(tmp_path):
+    channels = [1, 2]
+    number_of_events = 4
+    for channel in channels:
+        for trace_number in range(number_of_events):
+            tmp_file = tmp_path / f"C{channel}Trace{trace_number:05d}.trc"
+            tmp_file.write_bytes((files_path / "pulse_sequence.trc").read_bytes())
+
+    trace = lecroyscope.Trace(files_path / "pulse_sequence.trc")
+    for adc_values in [False, True]:
+        hdf5_file = tmp_path / "run.h5"
+        events = lecroyscope.writing.hdf5.write_hdf5(
+            hdf5_file, tmp_path, adc_values=adc_values, chunk_rows=8
+        )
+        assert events == number_of_events
+
+        data = lecroyscope.writing.hdf5.read_hdf5(hdf5_file, time=True)
+        assert_array_equal(
+            data["time"], np.tile(trace.time, (number_of_events * 20, 1))
+        )
+        assert_array_equal(data["event"], np.repeat(np.arange(number_of_events), 20))
+        for channel in channels:
+            assert_array_equal(
+                data[f"CH{channel}"], np.concatenate(number_of_events * [trace.voltage])
+            )
+        assert_array_equal(
+            data["trigger_time"],
+            np.concatenate(number_of_events * [trace.trigger_times[0]]),
+        )
+
+        # random access
+        data = lecroyscope.writing.hdf5.read_hdf5(hdf5_file, events=2, channels=[2])
+        assert "time" not in data
+        assert_array_equal(data["horiz_interval"], 20 * [trace.sampling_interval])
+        assert_array_equal(data["event"], 20 * [2])
+        assert "CH1" not in data
+        assert_array_equal(data["CH2"], trace.voltage)
+
+        data = lecroyscope.writing.hdf5.read_hdf5(hdf5_file, events=slice(1, 3))
+        assert len(data["CH1"]) == 40
+
+    # headers are stored
+    with h5py.File(hdf5_file, "r") as f:
+        # explicit number of rows per chunk
+        assert f["CH1"]["values"].chunks == (8, 502)
+        header = f["CH1"]["header"][0]
+        assert header["subarray_count"] == 20
+        assert header["vertical_gain"] == np.float32(trace.header["vertical_gain"])
+
+
+def test_hdf5_append(tmp_path):
+    hdf5_file = tmp_path / "append.h5"
+    trace = lecroyscope.Trace(files_path / "pulse.trc", channel=1)
+    with lecroyscope.writing.hdf5.HDF5Writer(hdf5_file, mode="w") as writer:
+        writer.append(trace)
+        assert len(writer) == 1
+
+    # append to existing file
+    with lecroyscope.writing.hdf5.HDF5Writer(hdf5_file) as writer:
+        writer.append(trace)
+        writer.append(trace)
+        assert len(writer) == 3
+
+        with pytest.raises(ValueError):
+            # different channels
+            writer.append(lecroyscope.Trace(files_path / "pulse.trc", channel=2))
+
+        with pytest.raises(ValueError):
+            # different data type
+            writer.append(
+                lecroyscope.Trace(files_path / "pulse.trc", channel=1, dtype=np.float32)
+            )
+
+    data = lecroyscope.writing.hdf5.read_hdf5(hdf5_file, events=-1)
+    assert_array_equal(data["CH1"], [trace.voltage])
+    with h5py.File(hdf5_file, "r") as f:
+        chunk_rows, points = f["CH1"]["values"].chunks
+        assert chunk_rows == 1024 * 1024 // (points * trace.dtype.itemsize)
+
+
+def test_hdf5_timebase(tmp_path):
+    hdf5_file = tmp_path / "timebase.h5"
+    trace = lecroyscope.Trace(files_path / "pulse.trc", channel=1)
+    header = dict(trace.header._raw)
+    header["horiz_interval"] *= 2
+    header["horiz_offset"] += 5e-6
+    lecroyscope.writing.trc.write(
+        tmp_path / "C1Trace00000.trc", header, trace.adc_values
+    )
+    other = lecroyscope.Trace(tmp_path / "C1Trace00000.trc")
+    assert_array_equal(other.adc_values, trace.adc_values)
+
+    lecroyscope.writing.hdf5.write_hdf5(hdf5_file, [trace, other])
+    for event, reference in enumerate([trace, other]):
+        data = lecroyscope.writing.hdf5.read_hdf5(hdf5_file, events=event, time=True)
+        assert_array_equal(data["time"], [reference.time])
+        assert_array_equal(data["horiz_interval"], [reference.sampling_interval])
+
+
+def test_hdf5_adc_dtype(tmp_path):
+    from lecroyscope.control.simulator import synthetic_trc
+
+    hdf5_file = tmp_path / "dtype.h5"
+    byte_trace = lecroyscope.Trace(synthetic_trc(1000, word=False), channel=1)
+    word_trace = lecroyscope.Trace(synthetic_trc(1000, word=True), channel=1)
+    with lecroyscope.writing.hdf5.HDF5Writer(
+        hdf5_file, mode="w", adc_values=True
+    ) as writer:
+        writer.append(byte_trace)
+        with pytest.raises(ValueError):
+            writer.append(word_trace)
+        assert len(writer) == 1
@@ -90,3 +90,111 @@ def test_writing_tree(tmp_path):
             assert_array_almost_equal(
                 np.array(voltages[channel]), trace.voltage.reshape((len(trace), -1))
             )
+
+
+def test_write_tree(tmp_path):
+    channels = [1, 3]
+    number_of_events = 5
+    for channel in channels:
+        for trace_number in range(number_of_events):
+            tmp_file = tmp_path / f"C{channel}Trace{trace_number:05d}.trc"
+            tmp_file.write_bytes((files_path / "pulse_sequence.trc").read_bytes())
+
+    trace = lecroyscope.Trace(files_path / "pulse_sequence.trc")
+    for source in [tmp_path, lecroyscope.Run(tmp_path)]:
+        for chunk_size in [1, 7, 1000]:
+            uproot_file = tmp_path / "run.root"
+            entries = lecroyscope.writing.root.write_tree(
+                uproot_file, source, chunk_size=chunk_size
+            )
+            assert entries == number_of_events * len(trace)
+
+            with uproot.open(uproot_file) as f:
+                tree = f["t"]
+                assert tree.num_entries == entries
+                for channel in channels:
+                    voltages = np.array(tree[f"CH{channel}"].array())
+                    assert_array_almost_equal(
+                        voltages, np.concatenate(number_of_events * [trace.voltage])
+                    )
+
+    # from an iterable of traces
+    entries = lecroyscope.writing.root.write_tree(
+        tmp_path / "traces.root",
+        (lecroyscope.Trace(files_path / "pulse.trc", channel=1) for _ in range(3)),
+        tree_name="pulses",
+    )
+    assert entries == 3
+    with uproot.open(tmp_path / "traces.root") as f:
+        assert f["pulses"].num_entries == 3
+
+
+def test_writing_tree_scalar_time_axis(tmp_path):
+    for filename in [files_path / "pulse.trc", files_path / "pulse_sequence.trc"]:
+        trace = lecroyscope.Trace(filename, channel=1)
+        branches = lecroyscope.writing.root.get_tree_branch_definitions(
+            trace, time_axis="scalar"
+        )
+        assert "time" not in branches
+
+        uproot_file = tmp_path / "scalar.root"
+        with uproot.recreate(uproot_file) as f:
+            tree = f.mktree("t", branches)
+            tree.extend(
+                lecroyscope.writing.root.get_tree_extend_data(trace, time_axis="scalar")
+            )
+
+        with uproot.open(uproot_file) as f:
+            tree = f["t"]
+            assert tree.num_entries == len(trace)
+            for horiz_interval, horiz_offset in zip(
+                tree["horiz_interval"].array(), tree["horiz_offset"].array()
+            ):
+                time = np.arange(len(trace.time)) * horiz_interval + horiz_offset
+                assert_array_almost_equal(time, trace.time)
+            if trace.sequence:
+                assert_array_equal(tree["trigger_time"].array(), trace.trigger_times[0])
+                assert_array_equal(
+                    tree["trigger_offset"].array(), trace.trigger_times[1]
+                )
+
+    with pytest.raises(ValueError):
+        lecroyscope.writing.root.get_tree_branch_definitions(trace, time_axis="none")
+
+
+def test_writing_tree_adc_values(tmp_path):
+    trace_group = lecroyscope.TraceGroup(
+        *[
+            lecroyscope.Trace(files_path / "pulse_sequence.trc", channel=channel)
+            for channel in [1, 2]
+        ]
+    )
+    uproot_file = tmp_path / "adc.root"
+    entries = lecroyscope.writing.root.write_tree(
+        uproot_file, [trace_group], adc_values=True, time_axis="scalar"
+    )
+    assert entries == len(trace_group[1])
+
+    with uproot.open(uproot_file) as f:
+        tree = f["t"]
+        for trace in trace_group:
+            adc = np.array(tree[f"CH{trace.channel}"].array())
+            assert adc.dtype == trace.adc_values.dtype
+            assert_array_equal(adc, trace.adc_values)
+
+            # voltage can be reconstructed without loss
+            gain = np.array(tree[f"CH{trace.channel}_vertical_gain"].array())
+            offset = np.array(tree[f"CH{trace.channel}_vertical_offset"].array())
+            assert_array_equal(adc * gain[:, None] - offset[:, None], trace.voltage)
+
+    # events with a different ADC data type cannot be stored in the same branches
+    from lecroyscope.control.simulator import synthetic_trc
+
+    traces = [
+        lecroyscope.Trace(synthetic_trc(1000, word=word), channel=1)
+        for word in [False, True]
+    ]
+    with pytest.raises(ValueError):
+        lecroyscope.writing.root.write_tree(
+            tmp_path / "mixed.root", traces, adc_values=True
+        )
@@ -0,0 +1,74 @@
+import pytest
+
+from pathlib import Path
+from numpy.testing import assert_array_equal
+import numpy as np
+
+import lecroyscope
+
+files_path = Path(__file__).parent / "files"
+
+
+def test_write_trace(tmp_path):
+    for filename in [
+        files_path / "pulse.trc",
+        files_path / "pulse_sequence.trc",
+        files_path / "issue_1.trc",
+    ]:
+        trace = lecroyscope.Trace(filename)
+        for endianness in [None, "<", ">"]:
+            output = tmp_path / "output.trc"
+            lecroyscope.writing.trc.write_trace(output, trace, endianness=endianness)
+
+            if endianness is None:
+                # same byte order, file should be identical
+                assert output.read_bytes() == filename.read_bytes()
+
+            trace_written = lecroyscope.Trace(output)
+            assert dict(trace_written.header) == {
+                **dict(trace.header),
+                "comm_order": 0 if endianness == ">" else 1,
+            }
+            assert_array_equal(trace_written.adc_values, trace.adc_values)
+            assert_array_equal(trace_written.trigger_times, trace.trigger_times)
+            assert_array_equal(trace_written.voltage, trace.voltage)
+            assert_array_equal(trace_written.time, trace.time)
+
+
+def test_write_segments(tmp_path):
+    filename = files_path / "pulse_sequence.trc"
+    trace = lecroyscope.Trace(filename)
+
+    # only some segments
+    trace_segments = lecroyscope.Trace(filename, segments=slice(5, 15, 2))
+    output = tmp_path / "segments.trc"
+    lecroyscope.writing.trc.write_trace(output, trace_segments)
+    trace_written = lecroyscope.Trace(output)
+    assert len(trace_written) == 5
+    assert trace_written.header["subarray_count"] == 5
+    assert_array_equal(trace_written.voltage, trace.voltage[5:15:2])
+    assert_array_equal(trace_written.trigger_times, trace.trigger_times[:, 5:15:2])
+
+    # streaming segments from a generator (decimated by 2)
+    output = tmp_path / "generator.trc"
+    header = dict(trace.header)
+    header["horiz_interval"] *= 2
+    lecroyscope.writing.trc.write(
+        output,
+        header,
+        (segment[::2] for segment in trace.adc_values),
+        trigger_times=trace.trigger_times,
+    )
+    trace_written = lecroyscope.Trace(output)
+    assert_array_equal(trace_written.adc_values, trace.adc_values[:, ::2])
+    assert_array_equal(trace_written.time, trace.time[::2])
+
+    with pytest.raises(ValueError):
+        # generator without trigger times
+        lecroyscope.writing.trc.write(
+            output, header, (segment for segment in trace.adc_values)
+        )
+
+    with pytest.raises(ValueError):
+        # not raw values
+        lecroyscope.writing.trc.write(output, header, trace.voltage)